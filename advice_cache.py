@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+def prompt_key(**request):
+    # モデル名・温度・プロンプトなど、応答に影響するパラメータ全体から決まるキー
+    return hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+# --- 永続キャッシュ ---
+class AdviceCache:
+    """プロンプトをキーにLLMの応答文をSQLiteに保存するキャッシュ。
+
+    ttl_seconds を過ぎた応答は使わずに作り直し、件数が max_entries を超えたら
+    最終アクセスが古いものから削除する（LRU）。
+    """
+
+    def __init__(self, path, ttl_seconds, max_entries):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS advice ("
+                " key TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_advice_last_access ON advice(last_access)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT text FROM advice WHERE key = ? AND created_at > ?", (key, now - self.ttl_seconds)).fetchone()
+            if row is None: return None
+            conn.execute("UPDATE advice SET last_access = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key, text):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO advice (key, text, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, text, now, now)
+            )
+            conn.execute("DELETE FROM advice WHERE created_at <= ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM advice WHERE key IN (SELECT key FROM advice ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+# --- 生成中の応答 ---
+class AdviceStream:
+    """バックグラウンドで生成中の応答文。
+
+    生成側が append() したテキスト片を、複数の読み手がそれぞれ先頭から
+    順に受け取れる（for chunk in stream）。result() は生成完了まで待って全文を返す。
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._done = False
+        self._cond = threading.Condition()
+
+    @classmethod
+    def completed(cls, text):
+        stream = cls()
+        stream.append(text)
+        stream.close()
+        return stream
+
+    def append(self, text):
+        with self._cond:
+            self._chunks.append(text)
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._done = True
+            self._cond.notify_all()
+
+    @property
+    def done(self):
+        return self._done
+
+    def __iter__(self):
+        index = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: index < len(self._chunks) or self._done)
+                chunks = self._chunks[index:]
+                done = self._done
+            index += len(chunks)
+            yield from chunks
+            if done and not chunks: return
+
+    def result(self, timeout=None):
+        with self._cond:
+            self._cond.wait_for(lambda: self._done, timeout)
+            return "".join(self._chunks)
+
+# --- 同一リクエストの重複排除 ---
+class SingleFlight:
+    """同じキーの生成が実行中なら新たに実行せず、その AdviceStream を共有する。"""
+
+    def __init__(self, executor):
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def start(self, key, produce):
+        # produce(stream) はバックグラウンドで実行され、stream にテキストを書き込む
+        with self._lock:
+            stream = self._calls.get(key)
+            if stream is not None: return stream
+            stream = self._calls[key] = AdviceStream()
+        self._executor.submit(self._run, key, stream, produce)
+        return stream
+
+    def _run(self, key, stream, produce):
+        try:
+            produce(stream)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            stream.close()
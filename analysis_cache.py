@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# --- 定数定義 ---
+LANDMARK_DTYPE = np.float16  # 正規化座標なので描画の再現にはfloat16で十分
+
+def config_fingerprint(config):
+    # 設定内容が同じならキー順やコメントの違いに関係なく同じハッシュになる
+    return hashlib.sha256(json.dumps(config, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+# --- 永続キャッシュ ---
+class AnalysisCache:
+    """画像ハッシュ＋設定ハッシュをキーに、生データとランドマークをSQLiteに保存するキャッシュ。
+
+    複数のStreamlitレプリカから同じファイルを共有できるようWALモードで開き、
+    合計サイズが max_bytes を超えたら最終アクセスが古いものから削除する（LRU）。
+    注釈画像は保存せず、必要になった時点でランドマークから描き直す。
+    """
+
+    def __init__(self, path, max_bytes, config_hash):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.config_hash = config_hash
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                " key TEXT PRIMARY KEY, raw TEXT, landmarks BLOB, landmark_count INTEGER,"
+                " size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_last_access ON analyses(last_access)")
+
+    @contextmanager
+    def _connect(self):
+        # Streamlitはセッションごとに別スレッドで動くため、接続は呼び出しごとに作って閉じる
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def key(self, image_bytes):
+        return f"{hashlib.sha256(image_bytes).hexdigest()}:{self.config_hash}"
+
+    def get(self, image_bytes):
+        """キャッシュがなければNone、あれば {"raw", "landmarks"} を返す（顔が検出されなかった場合は両方None）"""
+        key = self.key(image_bytes)
+        with self._connect() as conn:
+            row = conn.execute("SELECT raw, landmarks, landmark_count FROM analyses WHERE key = ?", (key,)).fetchone()
+            if row is None: return None
+            conn.execute("UPDATE analyses SET last_access = ? WHERE key = ?", (time.time(), key))
+        raw, blob, count = row
+        if raw is None: return {"raw": None, "landmarks": None}
+        landmarks = np.frombuffer(blob, dtype=LANDMARK_DTYPE).reshape(count, 3).astype(np.float32)
+        return {"raw": json.loads(raw), "landmarks": landmarks}
+
+    def put(self, image_bytes, features):
+        """extract_featuresの結果を保存する。顔が検出されなかった場合(None)も再計算を避けるため記録する"""
+        key = self.key(image_bytes)
+        if features is None:
+            raw, blob, count = None, None, 0
+        else:
+            raw = json.dumps(features["raw"])
+            blob = np.ascontiguousarray(features["landmarks"], dtype=LANDMARK_DTYPE).tobytes()
+            count = len(features["landmarks"])
+        size = len(key) + len(raw or "") + len(blob or b"")
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, raw, landmarks, landmark_count, size, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, raw, blob, count, size, time.time())
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        # 新しい順に累積サイズを数え、上限を超えた分をまとめて削除する
+        conn.execute(
+            "DELETE FROM analyses WHERE key IN ("
+            " SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY last_access DESC) AS total FROM analyses)"
+            " WHERE total > ?)",
+            (self.max_bytes,)
+        )
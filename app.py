@@ -1,10 +1,11 @@
 import streamlit as st
 from PIL import Image
 import yaml
-import plotly.graph_objects as go
 import io
-from features import FaceAnalyzer
-from gpt_advice import generate_summary_advice, generate_detailed_advice
+from concurrent.futures import ThreadPoolExecutor
+from analysis_cache import AnalysisCache, config_fingerprint
+from scoring import RAW_FEATURE_KEYS
+from gpt_advice import start_summary_advice, start_detailed_advice, prefetch_detailed_advice
 
 # --- 設定ファイルの読み込み ---
 try:
@@ -17,17 +18,54 @@ except FileNotFoundError:
     st.stop()
 
 # --- キャッシュ機能 ---
+# cv2/mediapipe(features)・plotlyは重いため、使う直前に読み込む
+def build_face_analyzer(**kwargs):
+    from features import FaceAnalyzer
+    return FaceAnalyzer(**kwargs).warm_up()
+
 @st.cache_resource
+def start_face_analyzer_warmup():
+    # FaceMeshの読み込みと初期化は起動直後から裏で進め、最初の画面表示を待たせない
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warmup")
+    future = executor.submit(build_face_analyzer)
+    executor.shutdown(wait=False)  # 初期化が終わったらスレッドを終了させる
+    return future
+
 def get_face_analyzer():
-    return FaceAnalyzer()
+    future = start_face_analyzer_warmup()
+    if future.exception() is not None:
+        # 初期化に失敗した結果はキャッシュに残さず、作り直す（失敗が続く場合はここで例外になる）
+        start_face_analyzer_warmup.clear()
+        future = start_face_analyzer_warmup()
+    return future.result()
+
+@st.cache_resource
+def get_group_face_analyzer():
+    return build_face_analyzer(max_num_faces=config.get('processing', {}).get('group_max_num_faces', 10))
+
+@st.cache_resource
+def get_analysis_cache():
+    cache_cfg = config.get('cache', {})
+    return AnalysisCache(
+        cache_cfg.get('path', '.cache/analysis.sqlite3'),
+        int(cache_cfg.get('max_mb', 256) * 1024 * 1024),
+        # 生データは採点の閾値や重みに依存しないため、抽出に関わる設定だけをキーに含める
+        config_fingerprint({"raw_features": RAW_FEATURE_KEYS, "processing": config.get('processing', {})})
+    )
 
-@st.cache_data
-def run_analysis(_analyzer, image_bytes):
-    image = Image.open(io.BytesIO(image_bytes))
-    return _analyzer.analyze(image)
+def run_analysis(analyzer, cache, image_bytes):
+    from features import to_rgb_array
+    # ディスクキャッシュには生データとランドマークだけを保存し、スコアはその都度計算する
+    features = cache.get(image_bytes)
+    if features is None:
+        features = analyzer.extract_features(to_rgb_array(Image.open(io.BytesIO(image_bytes))))
+        cache.put(image_bytes, features)
+    if features is None or features["raw"] is None: return None
+    return {**analyzer.evaluate(features["raw"]), "landmarks": features["landmarks"]}
 
 # --- UI描画関数 ---
 def create_radar_chart(results):
+    import plotly.graph_objects as go
     categories = [r.label for r in results.values()]
     scores = [r.normalized_score for r in results.values()]
     
@@ -44,23 +82,55 @@ def create_radar_chart(results):
     )
     return fig
 
+def show_advice_stream(stream, show, **kwargs):
+    # テキスト片が届くたびに同じ枠を描き直し、回答をトークン単位で表示する
+    placeholder = st.empty()
+    text = ""
+    for chunk in stream:
+        text += chunk
+        getattr(placeholder, show)(text, **kwargs)
+
 # --- メインUI ---
 st.set_page_config(page_title="就活写真添削アプリ", page_icon="📸")
 st.title("📸 就活写真添削アプリ")
 st.write("表情や構図、写真の品質まで多角的に分析し、具体的な改善アクションを提案します。")
 
-analyzer = get_face_analyzer()
+start_face_analyzer_warmup()
+analysis_cache = get_analysis_cache()
 uploaded_file = st.file_uploader("画像をアップロードしてください", type=["jpg", "jpeg", "png"])
+group_mode = st.checkbox("複数のショットが写った画像から最良の1枚を選ぶ（連続写真・コンタクトシート）")
 
 if uploaded_file:
     try:
+        analyzer = get_face_analyzer()
+        from features import to_rgb_array, render_annotations, display_image
         image_bytes = uploaded_file.getvalue()
-        analysis_data = run_analysis(analyzer, image_bytes)
         image = Image.open(io.BytesIO(image_bytes))
+        if group_mode:
+            # 1回の検出で全員を採点し、最もスコアの高い顔を以降の詳細表示に使う
+            faces = get_group_face_analyzer().analyze_faces(image)
+            analysis_data = faces[0] if faces else None
+            if len(faces) > 1:
+                st.subheader("🏆 ショットのランキング")
+                ranking_columns = st.columns(min(len(faces), 5))
+                for rank, face in enumerate(faces[:len(ranking_columns)], start=1):
+                    x, y, w, h = face["frame"]
+                    with ranking_columns[rank - 1]:
+                        shot = image.crop((int(x), int(y), int(x + w), int(y + h)))
+                        shot.thumbnail((320, 320))
+                        st.image(shot, use_container_width=True)
+                        st.caption(f"{rank}位: {face['final_score']:.1f} 点")
+        else:
+            analysis_data = run_analysis(analyzer, analysis_cache, image_bytes)
 
         if analysis_data:
             results = analysis_data["results"]
             final_score = analysis_data["final_score"]
+
+            # 指摘項目が決まった時点でAIアドバイスの生成を裏で始め、先に画面を描画する
+            problem_keys = [r.message_key for r in results.values() if r.status != "OK"]
+            summary_stream = start_summary_advice(problem_keys, final_score)
+            prefetch_detailed_advice(problem_keys)
             
             st.subheader("💯 総合スコア")
             score_rank = "S" if final_score >= 90 else "A" if final_score >= 80 else "B" if final_score >= 60 else "C"
@@ -71,13 +141,18 @@ if uploaded_file:
             
             st.markdown("---")
             
+            # ブラウザには原寸ではなく表示サイズに縮小した画像だけを送る
+            preview = display_image(image_bytes, config.get('display', {}).get('max_side', 800))
             col1, col2 = st.columns(2)
             with col1:
                 st.subheader("アップロード画像")
-                st.image(image, use_container_width=True)
+                st.image(preview, use_container_width=True)
             with col2:
                 st.subheader("AIの分析結果 (可視化)")
-                st.image(analysis_data["annotated_image"], use_container_width=True)
+                # 注釈は表示するときだけ、縮小画像の上に描く
+                if st.toggle("輪郭と目の高さを表示", value=True):
+                    overlay = analyzer.annotation_overlay(analysis_data["landmarks"], *image.size)
+                    st.image(render_annotations(to_rgb_array(preview), overlay), use_container_width=True)
             
             st.markdown("---")
             st.subheader("📈 詳細スコアと個別アドバイス")
@@ -121,24 +196,20 @@ if uploaded_file:
                         break
                 
                 with st.spinner(f"「{target_label}」についてAIがアドバイス中..."):
-                    detailed_advice = generate_detailed_advice(key)
-                    st.info(detailed_advice, icon="💡")
+                    show_advice_stream(start_detailed_advice(key), "info", icon="💡")
                 if st.button("閉じる", key=f"close_{key}"):
                     st.session_state.selected_advice = None
             
             st.markdown("---")
             st.subheader("💡 総合的なアドバイス")
-            problem_keys = [r.message_key for r in results.values() if r.status != "OK"]
             
             with st.spinner("AIが改善アクションを考案中です..."):
-                summary_advice = generate_summary_advice(problem_keys, final_score)
-                
                 if any(r.status == "ERROR" for r in results.values()):
-                    st.error(summary_advice, icon="🚨")
+                    show_advice_stream(summary_stream, "error", icon="🚨")
                 elif problem_keys:
-                    st.warning(summary_advice, icon="⚠️")
+                    show_advice_stream(summary_stream, "warning", icon="⚠️")
                 else:
-                    st.success(summary_advice, icon="✨")
+                    show_advice_stream(summary_stream, "success", icon="✨")
         else:
             st.warning("顔を検出できませんでした。")
 
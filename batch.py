@@ -0,0 +1,221 @@
+import argparse
+import collections
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+
+from PIL import Image
+
+from scoring import RAW_FEATURE_KEYS, SCORE_KEYS
+
+# --- 定数定義 ---
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+# ワーカープロセスが異常終了した（ネイティブコードのクラッシュやOOM）ときに、処理中だった画像に付けるエラー
+WORKER_CRASHED = "WORKER_CRASHED"
+MAX_IDLE_RESTARTS = 3
+
+# --- ワーカープロセス側の処理 ---
+# FaceMeshはプロセス間で共有できないため、各ワーカーが自分専用のインスタンスを1つ持つ
+_worker_analyzer = None
+_worker_keep_landmarks = False
+
+def _init_worker(keep_landmarks=False):
+    global _worker_analyzer, _worker_keep_landmarks
+    from features import FaceAnalyzer
+    _worker_analyzer = FaceAnalyzer().warm_up()
+    _worker_keep_landmarks = keep_landmarks
+
+def _error_record(path, error):
+    return {"path": path, "final_score": None, "error": error, "results": {}, "raw": None}
+
+def _analyze_path(path):
+    # 画像のデコードはワーカー内で行い、親プロセスには軽量な結果だけを返す
+    try:
+        with Image.open(path) as image:
+            data = _worker_analyzer.analyze(image)
+    except Exception as e:
+        return _error_record(path, str(e))
+    if data is None:
+        return _error_record(path, "NO_FACE")
+    record = {
+        "path": path,
+        "final_score": data["final_score"],
+        "error": None,
+        "results": {key: asdict(result) for key, result in data["results"].items()},
+        # 生データも残しておけば、設定を変えたときにscoring.pyで再採点できる
+        "raw": data["raw"]
+    }
+    # ランドマークは結果ストアに保存する場合だけ、float16にして親プロセスへ返す
+    if _worker_keep_landmarks: record["landmarks"] = data["landmarks"].astype("float16")
+    return record
+
+# --- 入力の収集 ---
+def collect_paths(source):
+    """ディレクトリ（再帰）またはマニフェスト（1行1パス）から画像パスを列挙する"""
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                    yield os.path.join(root, name)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(source))
+        with open(source, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'): continue
+                yield line if os.path.isabs(line) else os.path.join(base_dir, line)
+
+# --- バッチ実行 ---
+def iter_batch(paths, workers=None, max_pending=None, keep_landmarks=False):
+    """完了した順に結果を返すジェネレータ。
+
+    同時に投入するタスク数を max_pending で制限するため、
+    メモリ上にデコード済み画像が溜まり続けることはない。
+    ワーカーが異常終了した場合はプロセスプールを作り直し、そのとき処理中だった画像を
+    1件ずつ処理し直す。単独で処理してもプールを壊した画像だけを WORKER_CRASHED のエラーとして返す。
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    paths = iter(paths)
+    # requeue: 壊れたプールに投入できなかった画像（未処理）、suspects: 壊れたときに処理中だった画像
+    requeue, suspects = collections.deque(), collections.deque()
+    # 1件も分析できないまま壊れるプールが続く場合（初期化の失敗など）は中断する
+    idle_restarts = 0
+    while True:
+        isolate = bool(suspects)
+        if isolate:
+            source, limit, putback = _drain(suspects), 1, suspects.appendleft
+        else:
+            source, limit, putback = itertools.chain(_drain(requeue), paths), max_pending, requeue.appendleft
+        completed, crashed = yield from _run_pool(source, workers, limit, keep_landmarks, putback)
+        if completed: idle_restarts = 0
+        if crashed is None:
+            if isolate: continue
+            return
+        if len(crashed) == 1:
+            yield _error_record(crashed[0], WORKER_CRASHED)
+        else:
+            suspects.extend(crashed)
+        # 原因の切り分け中（1件ずつの処理）に壊れた分は、画像側の問題として数えない
+        if not completed and not isolate:
+            idle_restarts += 1
+            if idle_restarts >= MAX_IDLE_RESTARTS:
+                raise BrokenProcessPool("ワーカープロセスが1件も処理できずに異常終了を繰り返したため中断します")
+        print("ワーカープロセスが異常終了したため、プロセスプールを作り直して続行します", file=sys.stderr)
+
+def _drain(items):
+    while items:
+        yield items.popleft()
+
+def _run_pool(source, workers, max_pending, keep_landmarks, putback):
+    """1つのプロセスプールで source の画像を処理し、(分析できた件数, 異常終了時に処理中だった画像) を返す。
+
+    最後まで処理できた場合、後者はNone。プールが壊れた後に投入しようとした画像は putback で戻す。
+    """
+    pending = {}
+    completed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(keep_landmarks,)) as executor:
+        while True:
+            broken = False
+            for path in source:
+                try:
+                    pending[executor.submit(_analyze_path, path)] = path
+                except BrokenProcessPool:
+                    putback(path)
+                    broken = True
+                    break
+                if len(pending) >= max_pending: break
+            if not pending: return completed, ([] if broken else None)
+            crashed = []
+            # プールが壊れたら、残りの処理中の画像も完了（または失敗）するまで待って振り分ける
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        record = future.result()
+                    except BrokenProcessPool:
+                        crashed.append(path)
+                        continue
+                    completed += 1
+                    yield record
+                if not (crashed or broken): break
+            if crashed or broken: return completed, crashed
+
+# --- 出力 ---
+class JsonlWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, record):
+        record = {key: value for key, value in record.items() if key != "landmarks"}
+        self.f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.f.flush()
+
+class CsvWriter:
+    def __init__(self, f):
+        self.f = f
+        fields = ["path", "final_score", "error"]
+        for key in SCORE_KEYS:
+            fields += [f"{key}_value", f"{key}_status", f"{key}_score"]
+        fields += [f"raw_{key}" for key in RAW_FEATURE_KEYS]
+        self.writer = csv.DictWriter(f, fieldnames=fields)
+        self.writer.writeheader()
+
+    def write(self, record):
+        row = {"path": record["path"], "final_score": record["final_score"], "error": record["error"]}
+        for key, result in record["results"].items():
+            row[f"{key}_value"] = result["value"]
+            row[f"{key}_status"] = result["status"]
+            row[f"{key}_score"] = result["normalized_score"]
+        for key, value in (record["raw"] or {}).items():
+            row[f"raw_{key}"] = value
+        self.writer.writerow(row)
+        self.f.flush()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="就活写真をまとめて採点し、結果をJSONL/CSVで出力します。")
+    parser.add_argument("source", help="画像ディレクトリ、または1行1パスのマニフェストファイル")
+    parser.add_argument("-o", "--output", help="出力先（.jsonl または .csv）。省略時は標準出力にJSONL")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="ワーカープロセス数（既定: CPUコア数）")
+    parser.add_argument("--max-pending", type=int, default=None, help="同時に処理中とする画像の上限（既定: ワーカー数の2倍）")
+    parser.add_argument("--store", help="結果を追記する列形式の結果ストア（ディレクトリ）。store.pyで集計できる")
+    parser.add_argument("--store-landmarks", action="store_true", help="結果ストアにランドマーク(float16)も保存する")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    store_writer = None
+    if args.store:
+        from store import ResultWriter
+        store_writer = ResultWriter(args.store, landmarks=args.store_landmarks)
+    count = failed = crashed = 0
+    start = time.perf_counter()
+    try:
+        writer = CsvWriter(out) if args.output and args.output.lower().endswith('.csv') else JsonlWriter(out)
+        records = iter_batch(collect_paths(args.source), args.workers, args.max_pending, keep_landmarks=args.store_landmarks)
+        for record in records:
+            writer.write(record)
+            if store_writer: store_writer.write(record)
+            count += 1
+            if record["error"]: failed += 1
+            if record["error"] == WORKER_CRASHED: crashed += 1
+    except BaseException:
+        # 途中で止まった場合も、それまでの処理件数を表示してから終了する
+        print("処理を中断しました。", file=sys.stderr)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        if out is not sys.stdout: out.close()
+        if store_writer: store_writer.close()
+        throughput = count / elapsed if elapsed > 0 else 0
+        print(f"{count} 枚を {elapsed:.1f} 秒で処理しました（{throughput:.2f} 枚/秒、失敗 {failed} 枚"
+              f"、うちワーカー異常終了 {crashed} 枚）", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""AIアドバイスの「最初の表示までの時間」を、ローカルの疑似OpenAIサーバーで計測する
+
+    python benchmarks/advice_latency.py --first-token-ms 500 --token-ms 30
+
+sequential: 従来の画面と同じく、総合アドバイスと各詳細アドバイスを1件ずつ完了まで待つ
+concurrent: 総合アドバイスを先に開始し、詳細アドバイスも並行して先読み。総合はトークン単位で受け取る
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from openai import OpenAI
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gpt_advice  # noqa: E402
+from advice_cache import AdviceCache  # noqa: E402
+from fake_openai import serve  # noqa: E402
+
+PROBLEM_KEYS = ["SHARPNESS", "BRIGHTNESS", "SMILE"]
+
+
+def fresh_cache(tmpdir, name):
+    gpt_advice._advice_cache = AdviceCache(os.path.join(tmpdir, f"{name}.sqlite3"), 3600, 1000)
+
+
+def run_sequential():
+    start = time.perf_counter()
+    gpt_advice.generate_summary_advice(PROBLEM_KEYS, 65)
+    first = time.perf_counter() - start
+    for key in PROBLEM_KEYS:
+        gpt_advice.generate_detailed_advice(key)
+    return first, time.perf_counter() - start
+
+
+def run_concurrent():
+    start = time.perf_counter()
+    summary = gpt_advice.start_summary_advice(PROBLEM_KEYS, 65)
+    detailed = gpt_advice.prefetch_detailed_advice(PROBLEM_KEYS)
+    first = None
+    for _ in summary:
+        if first is None: first = time.perf_counter() - start
+    for stream in detailed.values():
+        stream.result()
+    return first, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--first-token-ms", type=float, default=500)
+    parser.add_argument("--token-ms", type=float, default=30)
+    parser.add_argument("--tokens", type=int, default=40)
+    args = parser.parse_args(argv)
+
+    server, base_url = serve(0, args.first_token_ms, args.token_ms, args.tokens)
+    gpt_advice.client = OpenAI(api_key="dummy", base_url=base_url)
+    print(f"{'mode':>12} {'first advice ms':>16} {'all advice ms':>14}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, fn in [("sequential", run_sequential), ("concurrent", run_concurrent)]:
+            fresh_cache(tmpdir, name)
+            first, total = fn()
+            print(f"{name:>12} {first * 1000:16.0f} {total * 1000:14.0f}")
+        # 2回目はキャッシュから返るため、APIへのリクエストは発生しない
+        before = server.request_count
+        first, total = run_concurrent()
+        print(f"{'cached':>12} {first * 1000:16.0f} {total * 1000:14.0f}  (API requests: {server.request_count - before})")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
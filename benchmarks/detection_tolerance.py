@@ -0,0 +1,83 @@
+"""顔検出を縮小画像で行った場合（processing.detection_max_side）と原寸で行った場合の採点結果の差を調べる
+
+使い方（リポジトリのルートで実行）:
+    python benchmarks/detection_tolerance.py photos/
+    python benchmarks/detection_tolerance.py manifest.txt --max-side 1280 --tolerance 2 --max-flip-rate 0.01
+
+同じ画像を detection_max_side=0（原寸）と --max-side の2通りで採点し、総合スコアの差の最大値、
+項目ごとのスコア差の最大値、ステータスが変わった写真を出力する。差が許容範囲
+（config.yaml の processing.detection_max_side に記載）を超えた場合は終了コード1を返す。
+長辺が --max-side 以下の画像はどちらでも同じ処理になるため、比較の対象外として数えるだけにする。
+"""
+import argparse
+import os
+import sys
+
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def score_images(analyzer, paths, max_side):
+    # 設定の detection_max_side だけを差し替えて採点する（分析器は設定をその都度読み直す）
+    import features
+    features.get_config().setdefault('processing', {})['detection_max_side'] = max_side
+    scored = {}
+    for path in paths:
+        with Image.open(path) as image:
+            scored[path] = analyzer.analyze(image)
+    return scored
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="画像ディレクトリ、または1行1パスのマニフェストファイル（実際の証明写真を使うこと）")
+    parser.add_argument("--max-side", type=int, default=1280, help="比較する detection_max_side")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="許容する総合スコアの差（点）")
+    parser.add_argument("--max-flip-rate", type=float, default=0.01, help="ステータスが変わってよい写真の割合")
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)
+    from batch import collect_paths
+    from features import FaceAnalyzer
+    from scoring import SCORE_KEYS
+
+    paths, skipped = [], 0
+    for path in collect_paths(args.source):
+        with Image.open(path) as image:
+            if max(image.size) > args.max_side: paths.append(path)
+            else: skipped += 1
+    analyzer = FaceAnalyzer()
+    full = score_images(analyzer, paths, 0)
+    reduced = score_images(analyzer, paths, args.max_side)
+
+    compared = detection_changed = 0
+    max_final, max_item = 0.0, {key: 0 for key in SCORE_KEYS}
+    flips = []
+    for path in paths:
+        a, b = full[path], reduced[path]
+        if a is None or b is None:
+            # 片方でだけ顔が見つからなかった場合も結果が変わったものとして扱う
+            if (a is None) != (b is None): detection_changed += 1
+            continue
+        compared += 1
+        max_final = max(max_final, abs(a["final_score"] - b["final_score"]))
+        for key in SCORE_KEYS:
+            max_item[key] = max(max_item[key], abs(a["results"][key].normalized_score - b["results"][key].normalized_score))
+            if a["results"][key].status != b["results"][key].status:
+                flips.append(f"{path} {key}: {a['results'][key].status} -> {b['results'][key].status}")
+
+    flipped_photos = len({flip.split(" ")[0] for flip in flips}) + detection_changed
+    flip_rate = flipped_photos / len(paths) if paths else 0.0
+    print(f"比較 {compared} 枚（長辺 {args.max_side}px 以下で対象外 {skipped} 枚、片方のみ顔検出 {detection_changed} 枚）")
+    print(f"総合スコアの差の最大値: {max_final:.2f} 点（許容 {args.tolerance} 点）")
+    print("項目ごとのスコア差の最大値: " + "、".join(f"{key} {value}" for key, value in max_item.items()))
+    print(f"ステータスが変わった写真: {flipped_photos} 枚（{flip_rate:.1%}、許容 {args.max_flip_rate:.1%}）", *flips, sep="\n  ")
+    if max_final > args.tolerance or flip_rate > args.max_flip_rate:
+        print("許容範囲を超えています。", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
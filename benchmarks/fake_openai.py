@@ -0,0 +1,77 @@
+"""OpenAI互換のチャットAPIを模したローカルサーバー（ネットワーク・APIキー不要）
+
+使い方:
+    python benchmarks/fake_openai.py --port 8001 --first-token-ms 500 --token-ms 30
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=dummy streamlit run app.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        model = body.get("model", "fake")
+        tokens = [f"アドバイス{i}。" for i in range(self.server.tokens)]
+        self.server.request_count += 1
+        time.sleep(self.server.first_token_ms / 1000)
+
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for i, token in enumerate(tokens):
+                if i: time.sleep(self.server.token_ms / 1000)
+                chunk = {
+                    "id": "fake", "object": "chat.completion.chunk", "created": 0, "model": model,
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+                }
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+
+        time.sleep(self.server.token_ms * (len(tokens) - 1) / 1000)
+        payload = json.dumps({
+            "id": "fake", "object": "chat.completion", "created": 0, "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)}
+        }, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=0, first_token_ms=500, token_ms=30, tokens=40):
+    """バックグラウンドスレッドでサーバーを起動し、(server, base_url) を返す"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeOpenAIHandler)
+    server.first_token_ms, server.token_ms, server.tokens = first_token_ms, token_ms, tokens
+    server.request_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--first-token-ms", type=float, default=500)
+    parser.add_argument("--token-ms", type=float, default=30)
+    parser.add_argument("--tokens", type=int, default=40)
+    args = parser.parse_args()
+    server, base_url = serve(args.port, args.first_token_ms, args.token_ms, args.tokens)
+    print(f"fake OpenAI server: {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
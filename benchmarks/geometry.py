@@ -0,0 +1,109 @@
+"""ランドマークからの幾何計算（輪郭の凸包・笑顔・傾き・構図）の旧実装と配列演算版を比較するベンチマーク
+
+使い方（リポジトリのルートで実行）:
+    python benchmarks/geometry.py --faces 1 5 --repeat 2000
+
+ランドマークはMediaPipeの出力と同じく x, y, z 属性を持つオブジェクト478個で与える。
+画像処理（明るさ・鮮明度）は含めず、1枚あたりの幾何計算のオーバーヘッドだけを計測する。
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import features  # noqa: E402
+from features import (  # noqa: E402
+    FACE_OVAL_INDICES, LEFT_EYE_BOTTOM, LEFT_EYE_LEFT_CORNER, LEFT_EYE_RIGHT_CORNER, LEFT_EYE_TOP,
+    MOUTH_LEFT, MOUTH_RIGHT, RIGHT_EYE_BOTTOM, RIGHT_EYE_LEFT_CORNER, RIGHT_EYE_RIGHT_CORNER, RIGHT_EYE_TOP
+)
+
+WIDTH, HEIGHT = 1920, 1080
+# FACEMESH_FACE_OVAL と同じく、輪郭の辺（頂点の組）の集合
+FACE_OVAL_EDGES = frozenset(zip(FACE_OVAL_INDICES.tolist(), np.roll(FACE_OVAL_INDICES, -1).tolist()))
+
+
+def make_faces(count, seed=0):
+    # 横に並んだ顔を想定し、顔ごとに少しずつずらした乱数のランドマークを作る
+    rng = np.random.default_rng(seed)
+    faces = []
+    for i in range(count):
+        points = rng.normal(0, 0.05, (478, 3)) + ((i + 0.5) / count, 0.5, 0)
+        faces.append([SimpleNamespace(x=float(np.float32(x)), y=float(np.float32(y)), z=float(np.float32(z))) for x, y, z in points])
+    return faces
+
+
+# --- 旧実装（1点ずつPythonで処理する） ---
+def legacy_ear(landmarks, top, bottom, left, right):
+    ver_dist = np.linalg.norm([landmarks[top].x - landmarks[bottom].x, landmarks[top].y - landmarks[bottom].y])
+    hor_dist = np.linalg.norm([landmarks[left].x - landmarks[right].x, landmarks[left].y - landmarks[right].y])
+    return ver_dist / hor_dist if hor_dist > 0 else 0
+
+
+def legacy_geometry(faces):
+    rows = []
+    for landmarks in faces:
+        landmark_array = np.array([[lm.x, lm.y, lm.z] for lm in landmarks], dtype=np.float32)
+        unique_indices = set(i for edge in FACE_OVAL_EDGES for i in edge)
+        face_points = np.array([[landmarks[i].x * WIDTH, landmarks[i].y * HEIGHT] for i in unique_indices], dtype=np.int32)
+        face_rect = cv2.boundingRect(cv2.convexHull(face_points))
+        mouth_width = np.linalg.norm([landmarks[MOUTH_LEFT].x - landmarks[MOUTH_RIGHT].x, landmarks[MOUTH_LEFT].y - landmarks[MOUTH_RIGHT].y])
+        eye_dist = np.linalg.norm([landmarks[LEFT_EYE_LEFT_CORNER].x - landmarks[RIGHT_EYE_RIGHT_CORNER].x, landmarks[LEFT_EYE_LEFT_CORNER].y - landmarks[RIGHT_EYE_RIGHT_CORNER].y])
+        left_ear = legacy_ear(landmarks, LEFT_EYE_TOP, LEFT_EYE_BOTTOM, LEFT_EYE_LEFT_CORNER, LEFT_EYE_RIGHT_CORNER)
+        right_ear = legacy_ear(landmarks, RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM, RIGHT_EYE_LEFT_CORNER, RIGHT_EYE_RIGHT_CORNER)
+        face_center = (face_rect[0] + face_rect[2] / 2, face_rect[1] + face_rect[3] / 2)
+        rows.append({
+            "mouth_ratio": mouth_width / eye_dist if eye_dist > 0 else 0,
+            "eye_aspect_ratio": (left_ear + right_ear) / 2,
+            "tilt": abs(landmarks[LEFT_EYE_TOP].y - landmarks[RIGHT_EYE_TOP].y),
+            "face_ratio": face_rect[3] / HEIGHT,
+            "center_offset": np.linalg.norm([face_center[0] - WIDTH / 2, face_center[1] - HEIGHT / 2]) / np.linalg.norm([WIDTH, HEIGHT]),
+            "landmarks": landmark_array
+        })
+    return rows
+
+
+# --- 新実装（features.FaceAnalyzer と同じ手順） ---
+def vectorized_geometry(analyzer, faces):
+    landmark_arrays = np.stack([features.landmarks_to_array(landmarks) for landmarks in faces])
+    face_rects = [cv2.boundingRect(analyzer._face_hull(landmark_array, WIDTH, HEIGHT)) for landmark_array in landmark_arrays]
+    frames = np.tile((0.0, 0.0, WIDTH, HEIGHT), (len(faces), 1))
+    return analyzer._calculate_geometry(landmark_arrays, np.array(face_rects, dtype=np.float64), frames, HEIGHT)
+
+
+def measure(fn, repeat):
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--faces", type=int, nargs="+", default=[1, 5], help="1枚あたりの顔の数")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    # FaceMeshは使わないので、mediapipeを読み込まずに幾何計算のメソッドだけを呼ぶ
+    analyzer = features.FaceAnalyzer.__new__(features.FaceAnalyzer)
+    print(f"{'faces':>5} {'legacy us':>10} {'vector us':>10} {'gain':>6} {'max diff':>9}")
+    for count in args.faces:
+        faces = make_faces(count)
+        legacy = legacy_geometry(faces)
+        vectorized = vectorized_geometry(analyzer, faces)
+        diff = max(abs(row[key] - vectorized[key][i]) for i, row in enumerate(legacy) for key in vectorized)
+        t0 = measure(lambda: legacy_geometry(faces), args.repeat)
+        t1 = measure(lambda: vectorized_geometry(analyzer, faces), args.repeat)
+        print(f"{count:5d} {t0 * 1e6:10.1f} {t1 * 1e6:10.1f} {t0 / t1:5.1f}x {diff:9.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""動画モード（live.find_best_shot）をローカルの動画ファイルで検証するベンチマーク
+
+使い方（リポジトリのルートで実行）:
+    python benchmarks/live_video.py                      # 合成動画を生成して検証
+    python benchmarks/live_video.py --video clip.mp4     # 手元の動画で計測
+    python benchmarks/live_video.py --frame-steps 1 2 4 --realtime
+
+合成動画はぼかしの強さをフレームごとに変えてあり、ぼかしのない1フレーム（--sharp-frame）が
+ベストショットとして選ばれるかを確認する。合成の顔をFaceMeshが検出できない場合は
+benchmarks/pipeline.py と同じく描いた顔の形から作ったランドマークで後段の処理を続ける。
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pipeline import FallbackFaceMesh, make_face_jpeg, synthetic_landmarks  # noqa: E402
+
+
+def write_video(path, width, height, frames, sharp_frame, fps=30):
+    # 1フレームだけぼかさず、それ以外は強さの異なるガウシアンぼかしをかけた動画を書き出す
+    face = cv2.cvtColor(np.asarray(Image.open(io.BytesIO(make_face_jpeg(width, height, 0)))), cv2.COLOR_RGB2BGR)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    for i in range(frames):
+        sigma = 0 if i == sharp_frame else 1.5 + (i % 5)
+        writer.write(face if sigma == 0 else cv2.GaussianBlur(face, (0, 0), sigma))
+    writer.release()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video", help="計測する動画ファイル（省略時は合成動画を生成）")
+    parser.add_argument("--size", default="1280x720", help="合成動画の 幅x高さ")
+    parser.add_argument("--frames", type=int, default=120, help="合成動画のフレーム数")
+    parser.add_argument("--sharp-frame", type=int, default=60, help="合成動画でぼかさないフレーム番号")
+    parser.add_argument("--frame-steps", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--realtime", action="store_true", help="分析が追いつかないフレームを捨てる")
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)
+    from features import FaceAnalyzer
+    from live import find_best_shot
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = args.video
+        if video is None:
+            width, height = (int(v) for v in args.size.lower().split("x"))
+            video = os.path.join(tmp, "synthetic.avi")
+            write_video(video, width, height, args.frames, args.sharp_frame)
+
+        print(f"{'step':>4} {'analyzed':>8} {'dropped':>7} {'fps':>7} {'best frame':>10} {'score':>6}")
+        for step in args.frame_steps:
+            analyzer = FaceAnalyzer(static_image_mode=False)
+            if args.video is None:
+                analyzer.face_mesh = FallbackFaceMesh(analyzer.face_mesh, synthetic_landmarks())
+            best = find_best_shot(video, analyzer, frame_step=step, realtime=args.realtime, max_seconds=0)
+            if best is None:
+                print(f"{step:4d} 顔を検出できたフレームがありません")
+                continue
+            stats = best["stats"]
+            print(f"{step:4d} {stats['analyzed']:8d} {stats['dropped']:7d} {stats['fps']:7.1f} "
+                  f"{best['frame_index']:10d} {best['final_score']:6.1f}")
+            if args.video is None and step == 1 and not args.realtime and best["frame_index"] != args.sharp_frame:
+                print(f"ぼかしのないフレーム {args.sharp_frame} が選ばれませんでした", file=sys.stderr)
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""HTTP採点サービスに同時接続数を段階的に上げて負荷をかけ、飽和時のリクエスト/秒を計測する
+
+使い方（リポジトリのルートで実行）:
+    python benchmarks/load_service.py --workers 4 --concurrency 1 2 4 8 16 32
+    python benchmarks/load_service.py --url http://127.0.0.1:8080 --duration 20
+
+--url を省略すると、service.py のサーバーをこのプロセス内で起動して計測する。
+503（キュー満杯による受付拒否）は失敗ではなくバックプレッシャーとして別に数える。
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from pipeline import make_face_jpeg  # noqa: E402
+
+
+def post(url, body):
+    request = urllib.request.Request(f"{url}/analyze", data=body, headers={"Content-Type": "image/jpeg"}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code
+
+
+def run_level(url, corpus, concurrency, duration):
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(index):
+        i = index
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            status = post(url, corpus[i % len(corpus)])
+            elapsed = time.perf_counter() - start
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status in (200, 422): latencies.append(elapsed)
+            if status == 503: time.sleep(0.05)
+            i += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    elapsed = time.perf_counter() - started
+    completed = len(latencies)
+    return {
+        "rps": completed / elapsed,
+        "p50": float(np.percentile(latencies, 50)) * 1000 if latencies else 0.0,
+        "p95": float(np.percentile(latencies, 95)) * 1000 if latencies else 0.0,
+        "rejected": statuses.get(503, 0),
+        "errors": sum(count for status, count in statuses.items() if status not in (200, 422, 503))
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="計測対象のサービスURL（省略時はプロセス内で起動）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="プロセス内で起動する場合のワーカー数")
+    parser.add_argument("--queue-size", type=int, default=16)
+    parser.add_argument("--size", default="1280x960", help="送信する合成画像の 幅x高さ")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="各段階の計測秒数")
+    args = parser.parse_args(argv)
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    corpus = [make_face_jpeg(width, height, seed) for seed in range(8)]
+
+    server = None
+    url = args.url
+    if url is None:
+        from service import AnalyzerPool, create_server
+        server = create_server("127.0.0.1", 0, AnalyzerPool(args.workers, args.queue_size))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"{'clients':>8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'503':>6} {'errors':>7}")
+    best = 0.0
+    for concurrency in args.concurrency:
+        stats = run_level(url, corpus, concurrency, args.duration)
+        best = max(best, stats["rps"])
+        print(f"{concurrency:>8} {stats['rps']:8.1f} {stats['p50']:9.1f} {stats['p95']:9.1f} {stats['rejected']:>6} {stats['errors']:>7}")
+    print(f"\n飽和時のスループット: {best:.1f} req/s")
+    if server: server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
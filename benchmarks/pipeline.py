@@ -0,0 +1,193 @@
+"""分析パイプラインの処理段階ごとの所要時間を、ローカル生成の合成画像で計測するベンチマーク
+
+使い方（リポジトリのルートで実行）:
+    python benchmarks/pipeline.py --sizes 640x480 1920x1080 4032x3024 --count 30
+    python benchmarks/pipeline.py --save-baseline benchmarks/baseline.json
+    python benchmarks/pipeline.py --baseline benchmarks/baseline.json --tolerance 0.25
+
+解像度ごとに新しいプロセスで計測するため、ピークRSSは解像度ごとの値になる。
+合成画像でFaceMeshが顔を検出できなかった場合は、描いた顔の形から作ったランドマークで
+後段の処理を続ける（face_meshの段階は実際の推論時間のまま計測される）。
+"""
+import argparse
+import io
+import json
+import math
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STAGES = [
+    "decode", "detect_resize", "face_mesh", "hull_mask", "color_conversion",
+    "brightness", "sharpness", "geometry", "scoring", "annotation"
+]
+# 顔の中心と半径（画像サイズに対する比率）
+FACE_GEOMETRY = (0.5, 0.45, 0.18, 0.27)
+
+
+# --- 合成データ ---
+def make_face_jpeg(width, height, seed):
+    # グラデーション背景に肌色の楕円・目・口を描き、ノイズでテクスチャを付けた顔画像
+    rng = np.random.default_rng(seed)
+    cx, cy, rx, ry = FACE_GEOMETRY
+    img = np.empty((height, width, 3), dtype=np.uint8)
+    img[:] = np.linspace(90, 170, height, dtype=np.uint8)[:, None, None]
+    center = (int(cx * width), int(cy * height))
+    axes = (int(rx * width), int(ry * height))
+    cv2.ellipse(img, center, axes, 0, 0, 360, (205, 170, 150), -1)
+    for side in (-1, 1):
+        eye = (int((cx + side * 0.4 * rx) * width), int((cy - 0.2 * ry) * height))
+        cv2.ellipse(img, eye, (max(1, axes[0] // 6), max(1, axes[1] // 16)), 0, 0, 360, (40, 30, 30), -1)
+    mouth = (int(cx * width), int((cy + 0.45 * ry) * height))
+    cv2.ellipse(img, mouth, (max(1, int(0.3 * axes[0])), max(1, axes[1] // 10)), 0, 0, 180, (150, 60, 60), -1)
+    img = np.clip(img + rng.normal(0, 6, img.shape), 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(img).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def synthetic_landmarks():
+    # 合成画像に描いた顔と同じ形になるよう、輪郭・目・口のランドマークを配置する
+    import features
+    cx, cy, rx, ry = FACE_GEOMETRY
+    points = [[cx, cy] for _ in range(478)]
+    oval = features.FACE_OVAL_INDICES
+    for k, index in enumerate(oval):
+        angle = 2 * math.pi * k / len(oval)
+        points[index] = [cx + rx * math.cos(angle), cy + ry * math.sin(angle)]
+    eye_y = cy - 0.2 * ry
+    for side, top, bottom, outer, inner in (
+        (-1, features.LEFT_EYE_TOP, features.LEFT_EYE_BOTTOM, features.LEFT_EYE_LEFT_CORNER, features.LEFT_EYE_RIGHT_CORNER),
+        (1, features.RIGHT_EYE_TOP, features.RIGHT_EYE_BOTTOM, features.RIGHT_EYE_RIGHT_CORNER, features.RIGHT_EYE_LEFT_CORNER),
+    ):
+        points[top] = [cx + side * 0.4 * rx, eye_y - 0.04 * ry]
+        points[bottom] = [cx + side * 0.4 * rx, eye_y + 0.04 * ry]
+        points[outer] = [cx + side * 0.55 * rx, eye_y]
+        points[inner] = [cx + side * 0.25 * rx, eye_y]
+    points[features.MOUTH_LEFT] = [cx - 0.3 * rx, cy + 0.45 * ry]
+    points[features.MOUTH_RIGHT] = [cx + 0.3 * rx, cy + 0.45 * ry]
+    return [SimpleNamespace(x=x, y=y, z=0.0) for x, y in points]
+
+
+class FallbackFaceMesh:
+    """実際のFaceMeshで推論し、顔が見つからなければ合成ランドマークを返す"""
+
+    def __init__(self, face_mesh, landmarks):
+        self.face_mesh = face_mesh
+        self.fallback = SimpleNamespace(multi_face_landmarks=[SimpleNamespace(landmark=landmarks)])
+        self.detected = 0
+
+    def process(self, img):
+        results = self.face_mesh.process(img)
+        if not results.multi_face_landmarks: return self.fallback
+        self.detected += 1
+        return results
+
+
+# --- 計測 ---
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else 0.0
+
+
+def run_resolution(width, height, count, variants):
+    from features import FaceAnalyzer
+    analyzer = FaceAnalyzer(profile=True)
+    analyzer.face_mesh = FallbackFaceMesh(analyzer.face_mesh, synthetic_landmarks())
+    corpus = [make_face_jpeg(width, height, seed) for seed in range(variants)]
+    analyzer.analyze(Image.open(io.BytesIO(corpus[0])))  # ウォームアップ
+    analyzer.face_mesh.detected = 0
+
+    stage_samples = {stage: [] for stage in STAGES}
+    totals = []
+    for i in range(count):
+        image = Image.open(io.BytesIO(corpus[i % variants]))
+        start = time.perf_counter()
+        analyzer.analyze(image)
+        totals.append(time.perf_counter() - start)
+        for stage in STAGES:
+            stage_samples[stage].append(analyzer.timer.timings.get(stage, 0.0))
+
+    stages = {}
+    for stage, samples in stage_samples.items():
+        mean = sum(samples) / len(samples)
+        stages[stage] = {"p50": percentile(samples, 50), "p95": percentile(samples, 95), "per_sec": 1 / mean if mean > 0 else None}
+    return {
+        "total": {"p50": percentile(totals, 50), "p95": percentile(totals, 95)},
+        "throughput": count / sum(totals),
+        # Linuxのru_maxrssはKB単位
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "detected": analyzer.face_mesh.detected,
+        "count": count,
+        "stages": stages
+    }
+
+
+def print_report(size, report):
+    print(f"\n== {size}  {report['throughput']:.2f} img/s  peak RSS {report['peak_rss_mb']:.0f} MB  "
+          f"(FaceMesh detected {report['detected']}/{report['count']})")
+    print(f"{'stage':>17} {'p50 ms':>9} {'p95 ms':>9} {'img/s':>10}")
+    for stage, stats in report["stages"].items():
+        per_sec = f"{stats['per_sec']:10.1f}" if stats["per_sec"] else f"{'-':>10}"
+        print(f"{stage:>17} {stats['p50']:9.2f} {stats['p95']:9.2f} {per_sec}")
+    print(f"{'total':>17} {report['total']['p50']:9.2f} {report['total']['p95']:9.2f} {report['throughput']:10.1f}")
+
+
+def find_regressions(reports, baseline, tolerance, min_ms):
+    # p50が基準値の(1 + tolerance)倍を超えた段階を列挙する。短すぎる段階は誤差が大きいので除外
+    regressions = []
+    for size, report in reports.items():
+        if size not in baseline: continue
+        pairs = [("total", report["total"], baseline[size]["total"])]
+        pairs += [(stage, stats, baseline[size]["stages"].get(stage)) for stage, stats in report["stages"].items()]
+        for name, current, base in pairs:
+            if not base or base["p50"] < min_ms: continue
+            if current["p50"] > base["p50"] * (1 + tolerance):
+                regressions.append(f"{size} {name}: p50 {base['p50']:.2f} ms -> {current['p50']:.2f} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["640x480", "1920x1080", "4032x3024"], help="幅x高さ の一覧")
+    parser.add_argument("--count", type=int, default=30, help="解像度ごとの計測回数")
+    parser.add_argument("--variants", type=int, default=4, help="解像度ごとに生成する合成画像の枚数")
+    parser.add_argument("--json", help="計測結果をJSONで保存するパス")
+    parser.add_argument("--save-baseline", help="計測結果を基準値として保存するパス")
+    parser.add_argument("--baseline", help="比較する基準値JSON。悪化があれば終了コード1")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="許容する悪化率（0.25 = 25%%）")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="比較対象とする段階の最小p50(ms)")
+    args = parser.parse_args(argv)
+
+    reports = {}
+    for size in args.sizes:
+        width, height = (int(v) for v in size.lower().split("x"))
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            reports[size] = executor.submit(run_resolution, width, height, args.count, args.variants).result()
+        print_report(size, reports[size])
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(reports, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = find_regressions(reports, json.load(f), args.tolerance, args.min_ms)
+        if regressions:
+            print("\n性能の悪化を検出しました:", *regressions, sep="\n  ", file=sys.stderr)
+            sys.exit(1)
+        print("\n基準値からの悪化はありません。")
+
+
+if __name__ == "__main__":
+    main()
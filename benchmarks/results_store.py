@@ -0,0 +1,102 @@
+"""採点結果の保存形式（batch.pyのJSONL と store.py の列形式ストア）のサイズと集計時間を比較するベンチマーク
+
+使い方（リポジトリのルートで実行）:
+    python benchmarks/results_store.py --count 100000
+    python benchmarks/results_store.py --count 20000 --landmarks
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scoring  # noqa: E402
+from store import ResultStore, ResultWriter  # noqa: E402
+
+
+def make_records(count, cfg, landmarks, seed=0):
+    # 生データを乱数で作り、scoring.score_tableで採点してbatch.pyと同じ形の記録にする
+    rng = np.random.default_rng(seed)
+    raw = {
+        "brightness": rng.uniform(60, 220, count), "mouth_ratio": rng.uniform(0.8, 1.4, count),
+        "eye_aspect_ratio": rng.uniform(0.15, 0.35, count), "tilt": rng.uniform(0, 0.05, count),
+        "face_ratio": rng.uniform(0.2, 0.7, count), "center_offset": rng.uniform(0, 0.2, count),
+        "sharpness": rng.uniform(20, 800, count)
+    }
+    table = scoring.score_table(raw, cfg)
+    for i in range(count):
+        record = {
+            "path": f"photos/{i:07d}.jpg",
+            "final_score": float(table["final_score"][i]),
+            "error": None,
+            "results": {
+                key: {
+                    "label": scoring.LABELS[key], "value": float(table["values"][key][i]),
+                    "status": scoring.STATUS_CODES[table["status"][key][i]],
+                    "message_key": scoring.MESSAGE_KEYS[key], "normalized_score": int(table["scores"][key][i])
+                }
+                for key in scoring.SCORE_KEYS
+            },
+            "raw": {key: float(values[i]) for key, values in raw.items()}
+        }
+        if landmarks: record["landmarks"] = rng.random((478, 3)).astype(np.float16)
+        yield record
+
+
+def jsonl_aggregate(path):
+    # JSONLを全件読み込んで、store.pyと同じ集計（総合スコアの分布とMESSAGE_KEYごとの指摘率）を行う
+    final_scores, status = [], {key: [] for key in scoring.SCORE_KEYS}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            final_scores.append(record["final_score"])
+            for key in scoring.SCORE_KEYS:
+                status[key].append(record["results"][key]["status"])
+    counts = np.histogram(final_scores, bins=np.linspace(0, 100, 11))[0]
+    rates = {scoring.MESSAGE_KEYS[key]: {code: values.count(code) / len(values) for code in ("WARN", "ERROR")} for key, values in status.items()}
+    return counts, rates
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--landmarks", action="store_true", help="ストアにランドマークも保存する")
+    args = parser.parse_args(argv)
+
+    cfg = scoring.load_config(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yaml"))
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path, store_path = os.path.join(tmp, "results.jsonl"), os.path.join(tmp, "store")
+        with open(jsonl_path, "w", encoding="utf-8") as f, ResultWriter(store_path, landmarks=args.landmarks) as writer:
+            for record in make_records(args.count, cfg, args.landmarks):
+                writer.write(record)
+                record.pop("landmarks", None)
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        start = time.perf_counter()
+        jsonl_counts, jsonl_rates = jsonl_aggregate(jsonl_path)
+        jsonl_seconds = time.perf_counter() - start
+
+        store = ResultStore(store_path)
+        start = time.perf_counter()
+        store_counts, _ = store.score_distribution()
+        store_rates = store.failure_rates()
+        store_seconds = time.perf_counter() - start
+
+        print(f"{'format':>7} {'size MiB':>9} {'aggregate ms':>13}")
+        print(f"{'jsonl':>7} {os.path.getsize(jsonl_path) / 2**20:9.1f} {jsonl_seconds * 1000:13.1f}")
+        print(f"{'store':>7} {directory_size(store_path) / 2**20:9.1f} {store_seconds * 1000:13.1f}")
+        # 総合スコアはfloat32で保存するため、階級の境界ちょうどの値だけ分布がずれることがある
+        print(f"分布の差: {int(np.abs(jsonl_counts - store_counts).sum())} 件、"
+              f"指摘率の最大差: {max(abs(jsonl_rates[k][c] - store_rates[k][c]) for k in jsonl_rates for c in ('WARN', 'ERROR')):.1e}")
+
+
+if __name__ == "__main__":
+    main()
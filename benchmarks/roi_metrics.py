@@ -0,0 +1,88 @@
+"""明るさ・鮮明度計算の旧実装（全画面）と新実装（顔ROIのみ）を比較するベンチマーク
+
+使い方（リポジトリのルートで実行）:
+    python benchmarks/roi_metrics.py --sizes 1024x768 4032x3024 --repeat 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from features import FaceAnalyzer  # noqa: E402
+
+
+def make_image(width, height, seed=0):
+    # 顔の輪郭に見立てた楕円と、ノイズ入りのグラデーションからなる合成画像
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(60, 200, width, dtype=np.float32)[None, :, None]
+    img = np.clip(gradient + rng.normal(0, 20, (height, width, 3)), 0, 255).astype(np.uint8)
+    center = (width // 2, height // 2)
+    axes = (int(width * 0.2), int(height * 0.3))
+    hull = cv2.convexHull(cv2.ellipse2Poly(center, axes, 0, 0, 360, 10).astype(np.int32))
+    return Image.fromarray(img), hull
+
+
+def legacy_measure(image, hull):
+    # ベースライン実装と同じ手順: PIL→RGB→BGR→RGB、全画面マスク、float64ラプラシアン、ブールインデックス
+    img_bgr = cv2.cvtColor(np.array(image.convert('RGB')), cv2.COLOR_RGB2BGR)
+    img_rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+    face_mask = np.zeros(img_rgb.shape[:2], dtype=np.uint8)
+    cv2.fillConvexPoly(face_mask, hull, 255)
+    brightness = cv2.mean(cv2.cvtColor(img_rgb, cv2.COLOR_RGB2GRAY), mask=face_mask)[0]
+    laplacian = cv2.Laplacian(cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY), cv2.CV_64F)
+    laplacian_face = laplacian[face_mask == 255]
+    return brightness, laplacian_face.var()
+
+
+def roi_measure(analyzer, image, hull):
+    img_rgb = np.asarray(image if image.mode == 'RGB' else image.convert('RGB'))
+    return analyzer._measure_faces(img_rgb, [hull], [cv2.boundingRect(hull)], 0)[0]
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["1024x768", "4032x3024"], help="幅x高さ の一覧")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    analyzer = FaceAnalyzer()
+    print(f"{'size':>11} {'impl':>7} {'median ms':>10} {'peak MiB':>9} {'brightness':>11} {'sharpness':>10}")
+    for size in args.sizes:
+        width, height = (int(v) for v in size.lower().split("x"))
+        image, hull = make_image(width, height)
+        rows = {
+            "legacy": (lambda: legacy_measure(image, hull)),
+            "roi": (lambda: roi_measure(analyzer, image, hull)),
+        }
+        stats = {}
+        for name, fn in rows.items():
+            elapsed, peak = measure(fn, args.repeat)
+            brightness, sharpness = fn()
+            stats[name] = (elapsed, peak)
+            print(f"{size:>11} {name:>7} {elapsed * 1000:10.1f} {peak / 2**20:9.1f} {brightness:11.3f} {sharpness:10.3f}")
+        (t0, m0), (t1, m1) = stats["legacy"], stats["roi"]
+        print(f"{size:>11} {'gain':>7} {t0 / t1:9.1f}x {m0 / max(m1, 1):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""起動時間を経路ごとに計測する（各計測は新しいPythonプロセスで行う）
+
+使い方（リポジトリのルートで実行）:
+    python benchmarks/startup.py --repeat 5
+
+ui          : Streamlitの画面スクリプト(app.py)を、アップロード前の初期表示まで実行する時間
+ui_warmup   : 上記に加えて、裏で進むFaceMeshの初期化が終わるまでの時間
+batch       : バッチCLIの親プロセスの読み込み時間
+batch_worker: バッチのワーカーが分析器を初期化し終えるまでの時間
+scoring     : 再採点だけを行う経路（画像処理を読み込まない）で1000件を採点するまでの時間
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 各スニペットは経過秒数を出力し、バックグラウンドのスレッドを待たずに終了する
+SNIPPETS = {
+    "ui": """
+import runpy
+runpy.run_path('app.py', run_name='__main__')
+""",
+    "ui_warmup": """
+import runpy
+namespace = runpy.run_path('app.py', run_name='__main__')
+namespace['get_face_analyzer']()
+""",
+    "batch": """
+import batch
+""",
+    "batch_worker": """
+import batch
+batch._init_worker()
+""",
+    "scoring": """
+import numpy as np
+import scoring
+cfg = scoring.load_config()
+scoring.score_table({key: np.random.rand(1000) for key in scoring.RAW_FEATURE_KEYS}, cfg)
+""",
+}
+TEMPLATE = """
+import time
+start = time.perf_counter()
+{body}
+print(time.perf_counter() - start)
+import os, sys
+sys.stdout.flush()
+os._exit(0)
+"""
+
+
+def measure(body):
+    result = subprocess.run(
+        [sys.executable, "-c", TEMPLATE.format(body=body.strip())],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("paths", nargs="*", default=list(SNIPPETS), help="計測する経路")
+    args = parser.parse_args(argv)
+
+    print(f"{'path':>13} {'median ms':>10} {'min ms':>8}")
+    for name in args.paths:
+        samples = [measure(SNIPPETS[name]) for _ in range(args.repeat)]
+        print(f"{name:>13} {statistics.median(samples) * 1000:10.0f} {min(samples) * 1000:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,163 +1,275 @@
+import bisect
+import io
 import cv2
 import numpy as np
-import mediapipe as mp
-import yaml
-from dataclasses import dataclass
+from PIL import Image
+import scoring
+from profiling import StageTimer, profiling_enabled
+from scoring import AnalysisResult  # 従来どおり features.AnalysisResult でも参照できるように
 
 # --- 初期設定 ---
-with open('config.yaml', 'r', encoding='utf-8') as f:
-    config = yaml.safe_load(f)
+# config.yamlは最初に必要になった時点で読み込む
+_config = None
 
-# --- データクラス定義 ---
-@dataclass
-class AnalysisResult:
-    label: str; value: float; status: str; message_key: str; normalized_score: int
+def get_config():
+    global _config
+    if _config is None:
+        _config = scoring.load_config()
+    return _config
 
 # --- 定数定義 ---
 MOUTH_LEFT, MOUTH_RIGHT = 61, 291
 LEFT_EYE_TOP, LEFT_EYE_BOTTOM, LEFT_EYE_LEFT_CORNER, LEFT_EYE_RIGHT_CORNER = 159, 145, 130, 33
 RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM, RIGHT_EYE_LEFT_CORNER, RIGHT_EYE_RIGHT_CORNER = 386, 374, 362, 263
+# mp.solutions.face_mesh.FACEMESH_FACE_OVAL の頂点（輪郭を一周する順）。mediapipeを読み込まずに使えるよう定数で持つ
+FACE_OVAL_INDICES = np.array([
+    10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288, 397, 365, 379, 378, 400, 377,
+    152, 148, 176, 149, 150, 136, 172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109
+], dtype=np.intp)
+# 距離を測る2点の組。(分子, 分母) の順に並べ、比を1回の配列演算でまとめて求める
+# 口幅/目の間隔, 左目の縦/横, 右目の縦/横
+GEOMETRY_SEGMENTS = np.array([
+    (MOUTH_LEFT, MOUTH_RIGHT), (LEFT_EYE_LEFT_CORNER, RIGHT_EYE_RIGHT_CORNER),
+    (LEFT_EYE_TOP, LEFT_EYE_BOTTOM), (LEFT_EYE_LEFT_CORNER, LEFT_EYE_RIGHT_CORNER),
+    (RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM), (RIGHT_EYE_LEFT_CORNER, RIGHT_EYE_RIGHT_CORNER)
+], dtype=np.intp)
+
+# --- ユーティリティ ---
+def to_rgb_array(image):
+    # PIL画像をRGBのnumpy配列に1回だけ変換する
+    return np.asarray(image if image.mode == 'RGB' else image.convert('RGB'))
+
+def landmarks_to_array(landmarks):
+    # MediaPipeのランドマーク列を (N, 3) float32 配列に変換する（中間のPythonリストを作らない）
+    return np.fromiter(
+        (value for lm in landmarks for value in (lm.x, lm.y, lm.z)), dtype=np.float32, count=3 * len(landmarks)
+    ).reshape(-1, 3)
 
 # --- メイン分析クラス ---
 class FaceAnalyzer:
-    def __init__(self):
+    def __init__(self, max_num_faces=1, profile=None, static_image_mode=True):
+        # mediapipeは読み込みが重いため、実際に分析器を作るときに初めてimportする
+        import mediapipe as mp
+        # static_image_mode=False は動画用のトラッキングモード。前のフレームの顔を追跡し、毎回の顔検出を省く
         self.face_mesh = mp.solutions.face_mesh.FaceMesh(
-            static_image_mode=True, max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.5
+            static_image_mode=static_image_mode, max_num_faces=max_num_faces, refine_landmarks=True,
+            min_detection_confidence=0.5, min_tracking_confidence=0.5
         )
+        # 処理段階ごとの所要時間。有効時は直近の分析の計測結果が self.timer.timings に残る
+        self.timer = StageTimer(profiling_enabled(get_config()) if profile is None else profile)
 
-    def _normalize(self, value, ideal, worst, is_range=False, range_min=0, range_max=0, higher_is_better=True):
-        if is_range:
-            center = (range_min + range_max) / 2
-            dist = abs(value - center)
-            max_dist = (range_max - range_min) / 2
-            score = (max_dist - dist) / max_dist * 100 if max_dist > 0 else 100
-        else:
-            if higher_is_better:
-                if ideal == worst: return 100 if value >= ideal else 0
-                score = ((value - worst) / (ideal - worst)) * 100
-            else:
-                if ideal == worst: return 100 if value <= ideal else 0
-                score = ((worst - value) / (worst - ideal)) * 100
-        return max(0, min(100, int(score)))
-
-    # 各評価項目を判定・正規化するプライベートメソッド群
-    def _evaluate_brightness(self, value):
-        cfg = config['brightness']
-        status = "OK" if cfg['ideal_min'] <= value <= cfg['ideal_max'] else "ERROR"
-        score = self._normalize(value, 0, 0, is_range=True, range_min=cfg['ideal_min'], range_max=cfg['ideal_max'])
-        return AnalysisResult("顔の明るさ", value, status, "BRIGHTNESS", score)
-
-    def _evaluate_smile(self, value):
-        cfg = config['smile']
-        status = "OK" if value >= cfg['ideal_min'] else "WARN"
-        score = self._normalize(value, cfg['ideal_value'], cfg['worst_value'])
-        return AnalysisResult("笑顔スコア", value, status, "SMILE", score)
-    
-    def _evaluate_tilt(self, value):
-        cfg = config['tilt']
-        status = "OK" if value <= cfg['ideal_max'] else "WARN"
-        score = self._normalize(value, cfg['ideal_value'], cfg['worst_value'], higher_is_better=False)
-        return AnalysisResult("顔の傾き", value, status, "TILT", score)
-
-    def _evaluate_face_ratio(self, value):
-        cfg = config['composition']
-        status = "OK" if cfg['face_ratio_min'] <= value <= cfg['face_ratio_max'] else "WARN"
-        score = self._normalize(abs(value - cfg['face_ratio_ideal']), 0, abs(cfg['face_ratio_worst'] - cfg['face_ratio_ideal']), higher_is_better=False)
-        return AnalysisResult("顔の比率", value, status, "FACE_RATIO", score)
-    
-    def _evaluate_center_offset(self, value):
-        cfg = config['composition']
-        status = "OK" if value <= cfg['center_offset_max'] else "WARN"
-        score = self._normalize(value, cfg['center_offset_ideal'], cfg['center_offset_worst'], higher_is_better=False)
-        return AnalysisResult("中心位置", value, status, "CENTER_OFFSET", score)
-
-    def _evaluate_sharpness(self, value):
-        cfg = config['sharpness']
-        status = "OK" if value >= cfg['laplacian_variance_min'] else "ERROR"
-        score = self._normalize(value, cfg['laplacian_variance_ideal'], cfg['laplacian_variance_worst'])
-        return AnalysisResult("写真の鮮明度", value, status, "SHARPNESS", score)
+    def warm_up(self):
+        # 最初の推論でグラフが初期化されるため、リクエストを受ける前に1回空の画像で推論しておく
+        self.face_mesh.process(np.zeros((64, 64, 3), dtype=np.uint8))
+        return self
 
     def analyze(self, image):
-        img_pil = image.convert('RGB')
-        img_bgr = cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
-        img_rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+        timer = self.timer
+        timer.reset()
+        with timer.stage("decode"):
+            img_rgb = to_rgb_array(image)
+        features = self.extract_features(img_rgb)
+        if features is None: return None
+
+        with timer.stage("scoring"):
+            evaluation = self.evaluate(features["raw"])
+        # 注釈画像は描かず、表示時に合成できる軽量なベクター情報だけを返す
+        with timer.stage("annotation"):
+            overlay = self.annotation_overlay(features["landmarks"], img_rgb.shape[1], img_rgb.shape[0])
+        analysis = {
+            "results": evaluation["results"],
+            "overlay": overlay,
+            "final_score": evaluation["final_score"],
+            "raw": features["raw"],
+            "landmarks": features["landmarks"]
+        }
+        if timer.enabled: analysis["timings"] = dict(timer.timings)
+        return analysis
+
+    def analyze_faces(self, image):
+        # 画像内のすべての顔を個別に採点し、総合スコアの高い順に返す（集合写真・連続写真用）
+        timer = self.timer
+        timer.reset()
+        with timer.stage("decode"):
+            img_rgb = to_rgb_array(image)
+        faces = []
+        for features in self.extract_all_features(img_rgb):
+            with timer.stage("scoring"):
+                faces.append({**self.evaluate(features["raw"]), **features})
+        return sorted(faces, key=lambda face: face["final_score"], reverse=True)
+
+    def extract_features(self, img_rgb):
+        # 画像から生データとランドマーク(正規化座標, (N, 3) float32)を抽出する。顔がなければNone
+        faces = self.extract_all_features(img_rgb)
+        return faces[0] if faces else None
+
+    def extract_all_features(self, img_rgb):
+        # 1回の検出で見つかったすべての顔について生データを抽出する
         height, width, _ = img_rgb.shape
-        results = self.face_mesh.process(img_rgb)
+        processing_cfg = get_config().get('processing', {})
+        timer = self.timer
+
+        # 顔検出は縮小画像で行う（ランドマークは正規化座標なので原寸にそのまま戻せる）
+        with timer.stage("detect_resize"):
+            detect_rgb, _ = self._resize_max_side(img_rgb, processing_cfg.get('detection_max_side', 0))
+        with timer.stage("face_mesh"):
+            results = self.face_mesh.process(detect_rgb)
+
+        if not results.multi_face_landmarks: return []
 
-        if not results.multi_face_landmarks: return None
+        with timer.stage("hull_mask"):
+            # 全顔のランドマークを (顔数, 478, 3) の1つの配列にまとめ、以降の幾何計算は顔数によらず1回で行う
+            landmark_arrays = np.stack([landmarks_to_array(face.landmark) for face in results.multi_face_landmarks])
+            hulls = [self._face_hull(landmark_array, width, height) for landmark_array in landmark_arrays]
+            face_rects = [cv2.boundingRect(hull) for hull in hulls]
 
-        landmarks = results.multi_face_landmarks[0].landmark
-        
-        unique_indices = set(i for conn in mp.solutions.face_mesh.FACEMESH_FACE_OVAL for i in conn)
-        face_points = np.array([[landmarks[i].x * width, landmarks[i].y * height] for i in unique_indices], dtype=np.int32)
-        hull = cv2.convexHull(face_points)
-        face_mask = np.zeros((height, width), dtype=np.uint8)
-        cv2.fillConvexPoly(face_mask, hull, 255)
+        # 明るさ・鮮明度は全顔を囲む領域のグレー画像とラプラシアンを1回だけ作り、顔ごとにマスクして計算する
+        measurements = self._measure_faces(img_rgb, hulls, face_rects, processing_cfg.get('measure_max_side', 0))
 
         # 生データの計算
-        raw_brightness = cv2.mean(cv2.cvtColor(img_rgb, cv2.COLOR_RGB2GRAY), mask=face_mask)[0]
-        raw_smile_score = self._calculate_smile_score(landmarks)
-        raw_tilt_score = abs(landmarks[LEFT_EYE_TOP].y - landmarks[RIGHT_EYE_TOP].y)
-        face_rect = cv2.boundingRect(hull)
-        raw_face_ratio = face_rect[3] / height
-        face_center = (face_rect[0] + face_rect[2] / 2, face_rect[1] + face_rect[3] / 2)
-        raw_center_offset = np.linalg.norm([face_center[0] - width/2, face_center[1] - height/2]) / np.linalg.norm([width, height])
-        raw_sharpness = self._calculate_sharpness(img_bgr, face_mask)
-
-        # 構造化された結果を生成
-        analysis_results = {
-            "brightness": self._evaluate_brightness(raw_brightness),
-            "smile": self._evaluate_smile(raw_smile_score),
-            "tilt": self._evaluate_tilt(raw_tilt_score),
-            "face_ratio": self._evaluate_face_ratio(raw_face_ratio),
-            "center_offset": self._evaluate_center_offset(raw_center_offset),
-            "sharpness": self._evaluate_sharpness(raw_sharpness)
+        with timer.stage("geometry"):
+            # 構図は画像全体ではなく、その顔が写っているショットの枠を基準に評価する（顔が1つなら画像全体）
+            frames = self._face_frames(face_rects, width, height)
+            raw = self._calculate_geometry(landmark_arrays, np.array(face_rects, dtype=np.float64), np.array(frames, dtype=np.float64), height)
+            raw["brightness"] = np.array([brightness for brightness, _ in measurements], dtype=np.float64)
+            raw["sharpness"] = np.array([sharpness for _, sharpness in measurements], dtype=np.float64)
+
+        return [
+            {
+                "raw": {key: float(raw[key][i]) for key in scoring.RAW_FEATURE_KEYS},
+                "landmarks": landmark_array,
+                "face_rect": face_rect,
+                "frame": frame
+            }
+            for i, (landmark_array, face_rect, frame) in enumerate(zip(landmark_arrays, face_rects, frames))
+        ]
+
+    def evaluate(self, raw):
+        # 採点は画像に依存しない純粋な処理としてscoringモジュールに任せる
+        return scoring.evaluate(raw, get_config())
+
+    def _face_hull(self, landmark_array, width, height):
+        face_points = (landmark_array[FACE_OVAL_INDICES, :2].astype(np.float64) * (width, height)).astype(np.int32)
+        return cv2.convexHull(face_points)
+
+    def _resize_max_side(self, img, max_side):
+        # 長辺がmax_sideを超える場合のみ縮小し、(画像, 倍率)を返す
+        h, w = img.shape[:2]
+        if not max_side or max(h, w) <= max_side: return img, 1.0
+        scale = max_side / max(h, w)
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        return cv2.resize(img, size, interpolation=cv2.INTER_AREA), scale
+
+    def _measure_faces(self, img_rgb, hulls, face_rects, max_side):
+        # 全顔を囲む領域を1pxの余白付きで切り出し（ラプラシアンの近傍が全体画像と一致するように）、
+        # グレースケール化とラプラシアンは1回だけ行う。戻り値は顔ごとの (明るさ, 鮮明度)
+        height, width = img_rgb.shape[:2]
+        timer = self.timer
+        x0 = max(0, min(x for x, y, w, h in face_rects) - 1)
+        y0 = max(0, min(y for x, y, w, h in face_rects) - 1)
+        x1 = min(width, max(x + w for x, y, w, h in face_rects) + 1)
+        y1 = min(height, max(y + h for x, y, w, h in face_rects) + 1)
+        with timer.stage("color_conversion"):
+            gray = cv2.cvtColor(img_rgb[y0:y1, x0:x1], cv2.COLOR_RGB2GRAY)
+
+            # 縮小する場合は、最も大きい顔の長辺がmax_sideに収まる倍率で領域全体を縮小する
+            longest = max(max(w, h) for x, y, w, h in face_rects)
+            scale = max_side / longest if max_side and longest > max_side else 1.0
+            if scale != 1.0:
+                size = (max(1, round(gray.shape[1] * scale)), max(1, round(gray.shape[0] * scale)))
+                gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+        # uint8入力のラプラシアンは整数値なのでfloat32で誤差なく表現できる
+        with timer.stage("sharpness"):
+            laplacian = cv2.Laplacian(gray, cv2.CV_32F)
+
+        measurements = []
+        for hull, (x, y, w, h) in zip(hulls, face_rects):
+            rx0, ry0 = max(0, int((x - x0) * scale)), max(0, int((y - y0) * scale))
+            rx1 = min(gray.shape[1], int(np.ceil((x + w - x0) * scale)))
+            ry1 = min(gray.shape[0], int(np.ceil((y + h - y0) * scale)))
+            with timer.stage("hull_mask"):
+                face_hull = np.round((hull.reshape(-1, 2) - (x0, y0)) * scale - (rx0, ry0)).astype(np.int32)
+                mask = np.zeros((max(0, ry1 - ry0), max(0, rx1 - rx0)), dtype=np.uint8)
+                cv2.fillConvexPoly(mask, face_hull, 255)
+            with timer.stage("brightness"):
+                brightness = cv2.mean(gray[ry0:ry1, rx0:rx1], mask=mask)[0]
+            with timer.stage("sharpness"):
+                sharpness = self._calculate_sharpness(laplacian[ry0:ry1, rx0:rx1], mask)
+            measurements.append((brightness, sharpness))
+        return measurements
+
+    def _face_frames(self, face_rects, width, height):
+        # 顔の中心を列・行ごとにまとめ、隣り合う列(行)の中間で画像を区切った枠を各ショットの範囲とみなす
+        if len(face_rects) == 1: return [(0, 0, width, height)]
+        columns = self._split_axis([x + w / 2 for x, y, w, h in face_rects], np.median([w for x, y, w, h in face_rects]), width)
+        rows = self._split_axis([y + h / 2 for x, y, w, h in face_rects], np.median([h for x, y, w, h in face_rects]), height)
+        return [(column[0], row[0], column[1], row[1]) for column, row in zip(columns, rows)]
+
+    def _split_axis(self, centers, face_size, length):
+        # 顔の大きさの半分以上離れた中心は別の列(行)とみなし、各中心が属する (開始位置, 幅) を返す
+        ordered = sorted(centers)
+        groups = [[ordered[0]]]
+        for center in ordered[1:]:
+            if center - groups[-1][-1] > face_size / 2: groups.append([center])
+            else: groups[-1].append(center)
+        means = [sum(group) / len(group) for group in groups]
+        edges = [0] + [(a + b) / 2 for a, b in zip(means, means[1:])] + [length]
+        cells = []
+        for center in centers:
+            index = min(max(bisect.bisect_right(edges, center) - 1, 0), len(means) - 1)
+            cells.append((edges[index], edges[index + 1] - edges[index]))
+        return cells
+
+    def _calculate_geometry(self, landmark_arrays, face_rects, frames, height):
+        # 全顔の幾何特徴を配列演算でまとめて求める。引数は (顔数, 478, 3) のランドマークと (顔数, 4) の x, y, w, h
+        # ランドマークはfloat32だが、距離や比はfloat64で計算する（mediapipeの値はfloat32なので変換で誤差は出ない）
+        points = landmark_arrays[:, GEOMETRY_SEGMENTS, :2].astype(np.float64)
+        delta = points[:, :, 0] - points[:, :, 1]
+        dist = np.sqrt((delta * delta).sum(axis=-1))
+        numerator, denominator = dist[:, 0::2], dist[:, 1::2]
+        ratios = np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+        # 傾きは両目の上端の高さの差。ショットの枠で切り分けた場合は枠の高さに対する比に直す
+        eye_y = landmark_arrays[:, (LEFT_EYE_TOP, RIGHT_EYE_TOP), 1].astype(np.float64)
+        tilt = np.abs(eye_y[:, 0] - eye_y[:, 1]) * (height / frames[:, 3])
+        offset = (face_rects[:, :2] + face_rects[:, 2:] / 2) - (frames[:, :2] + frames[:, 2:] / 2)
+        return {
+            # 笑顔スコアの元になる2成分（口幅/目の間隔, 両目の平均EAR）。重み付けはscoring側で行う
+            "mouth_ratio": ratios[:, 0],
+            "eye_aspect_ratio": (ratios[:, 1] + ratios[:, 2]) / 2,
+            "tilt": tilt,
+            "face_ratio": face_rects[:, 3] / frames[:, 3],
+            "center_offset": np.sqrt((offset * offset).sum(axis=1)) / np.sqrt((frames[:, 2:] ** 2).sum(axis=1))
         }
-        
-        # 総合スコアの計算
-        total_score = 0
-        total_weight = 0
-        weights = config['scoring_weights']
-        for key, result in analysis_results.items():
-            weight = weights.get(key, 0)
-            total_score += result.normalized_score * weight
-            total_weight += weight
-        final_score = total_score / total_weight if total_weight > 0 else 0
-
-        annotated_image = self._draw_annotations(img_rgb, hull, landmarks)
-        
+
+    def _calculate_sharpness(self, laplacian, face_mask):
+        # 分散はマスク付きのmeanStdDevで求めるため、顔の画素をコピーする必要がない
+        if not cv2.countNonZero(face_mask): return 0
+        _, stddev = cv2.meanStdDev(laplacian, mask=face_mask)
+        return float(stddev[0][0]) ** 2
+
+    def annotation_overlay(self, landmark_array, width, height):
+        # 輪郭(凸包)と目の高さの補助線を、表示サイズに依存しない正規化座標で返す
+        hull = self._face_hull(landmark_array, width, height).reshape(-1, 2)
         return {
-            "results": analysis_results,
-            "annotated_image": annotated_image,
-            "final_score": final_score
+            "hull": (hull / (width, height)).astype(np.float32),
+            "eye_lines": [float(landmark_array[LEFT_EYE_TOP, 1]), float(landmark_array[RIGHT_EYE_TOP, 1])]
         }
 
-    def _calculate_ear(self, landmarks, eye_top_idx, eye_bottom_idx, eye_left_idx, eye_right_idx):
-        eye_top = landmarks[eye_top_idx]; eye_bottom = landmarks[eye_bottom_idx]
-        eye_left = landmarks[eye_left_idx]; eye_right = landmarks[eye_right_idx]
-        ver_dist = np.linalg.norm([eye_top.x - eye_bottom.x, eye_top.y - eye_bottom.y])
-        hor_dist = np.linalg.norm([eye_left.x - eye_right.x, eye_left.y - eye_right.y])
-        return ver_dist / hor_dist if hor_dist > 0 else 0
-
-    def _calculate_smile_score(self, landmarks):
-        mouth_width = np.linalg.norm([landmarks[MOUTH_LEFT].x - landmarks[MOUTH_RIGHT].x, landmarks[MOUTH_LEFT].y - landmarks[MOUTH_RIGHT].y])
-        eye_dist = np.linalg.norm([landmarks[LEFT_EYE_LEFT_CORNER].x - landmarks[RIGHT_EYE_RIGHT_CORNER].x, landmarks[LEFT_EYE_LEFT_CORNER].y - landmarks[RIGHT_EYE_RIGHT_CORNER].y])
-        mouth_score = mouth_width / eye_dist if eye_dist > 0 else 0
-        left_ear = self._calculate_ear(landmarks, LEFT_EYE_TOP, LEFT_EYE_BOTTOM, LEFT_EYE_LEFT_CORNER, LEFT_EYE_RIGHT_CORNER)
-        right_ear = self._calculate_ear(landmarks, RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM, RIGHT_EYE_LEFT_CORNER, RIGHT_EYE_RIGHT_CORNER)
-        avg_ear = (left_ear + right_ear) / 2
-        eye_smile_score = max(0, 1 - (avg_ear / config['smile']['eye_aspect_ratio_base']))
-        return (mouth_score * config['smile']['mouth_weight']) + (eye_smile_score * config['smile']['eyes_weight'])
-
-    def _calculate_sharpness(self, img_bgr, face_mask):
-        gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-        laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-        laplacian_face = laplacian[face_mask == 255]
-        return laplacian_face.var() if laplacian_face.size > 0 else 0
-
-    def _draw_annotations(self, img_rgb, hull, landmarks):
-        annotated_image = img_rgb.copy()
-        cv2.line(annotated_image, (0, int(landmarks[LEFT_EYE_TOP].y * img_rgb.shape[0])), (img_rgb.shape[1], int(landmarks[LEFT_EYE_TOP].y * img_rgb.shape[0])), (255, 0, 0), 1)
-        cv2.line(annotated_image, (0, int(landmarks[RIGHT_EYE_TOP].y * img_rgb.shape[0])), (img_rgb.shape[1], int(landmarks[RIGHT_EYE_TOP].y * img_rgb.shape[0])), (255, 0, 0), 1)
-        cv2.polylines(annotated_image, [hull], isClosed=True, color=(0, 255, 0), thickness=2)
-        return annotated_image
\ No newline at end of file
+# --- 注釈の描画 ---
+def render_annotations(img_rgb, overlay):
+    # 表示用に縮小した画像のコピーへ注釈を描く（原寸画像のコピーは作らない）
+    height, width = img_rgb.shape[:2]
+    annotated_image = img_rgb.copy()
+    for eye_y in overlay["eye_lines"]:
+        y = int(eye_y * height)
+        cv2.line(annotated_image, (0, y), (width, y), (255, 0, 0), 1)
+    hull = np.round(overlay["hull"] * (width, height)).astype(np.int32)
+    cv2.polylines(annotated_image, [hull], isClosed=True, color=(0, 255, 0), thickness=2)
+    return annotated_image
+
+def display_image(image_bytes, max_side):
+    # JPEGは縮小デコード(draft)が効くため、原寸にデコードせずに表示用サムネイルを作れる
+    thumbnail = Image.open(io.BytesIO(image_bytes))
+    thumbnail.thumbnail((max_side, max_side))
+    return thumbnail if thumbnail.mode == 'RGB' else thumbnail.convert('RGB')
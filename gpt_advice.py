@@ -1,9 +1,74 @@
-from dotenv import load_dotenv
+import argparse
 import os
-from openai import OpenAI
+import yaml
+from concurrent.futures import ThreadPoolExecutor
+from advice_cache import AdviceCache, AdviceStream, SingleFlight, prompt_key
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# テストではローカルのスタブを代入して差し替えられるよう、モジュール属性として保持する。
+# openaiの読み込みとクライアントの生成は、最初にAPIを呼ぶときまで遅らせる
+client = None
+MODEL = "gpt-4o-mini"
+
+def get_client():
+    global client
+    if client is None:
+        from dotenv import load_dotenv
+        from openai import OpenAI
+        load_dotenv()
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return client
+
+# --- 応答キャッシュと非同期生成 ---
+_advice_cache = None
+# APIの待ち時間はI/Oなので、スレッドで並行に投げて画面の描画を先に進める
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="advice")
+_single_flight = SingleFlight(_executor)
+
+def get_advice_cache():
+    global _advice_cache
+    if _advice_cache is None:
+        try:
+            with open('config.yaml', 'r', encoding='utf-8') as f:
+                cache_cfg = (yaml.safe_load(f) or {}).get('advice_cache', {})
+        except FileNotFoundError:
+            cache_cfg = {}
+        _advice_cache = AdviceCache(
+            cache_cfg.get('path', '.cache/advice.sqlite3'),
+            cache_cfg.get('ttl_hours', 168) * 3600,
+            cache_cfg.get('max_entries', 1000)
+        )
+    return _advice_cache
+
+def _start(prompt, temperature, max_tokens):
+    # キャッシュにあれば完成済みのストリームを返す。なければバックグラウンドで生成を始め、
+    # 同時に来た同一リクエストには同じストリームを渡して1回のAPI呼び出しにまとめる
+    key = prompt_key(model=MODEL, prompt=prompt, temperature=temperature, max_tokens=max_tokens)
+    cache = get_advice_cache()
+    cached = cache.get(key)
+    if cached is not None: return AdviceStream.completed(cached)
+
+    def produce(stream):
+        # 直前に別スレッド・別プロセスが生成を終えている場合もあるので、もう一度確認する
+        cached = cache.get(key)
+        if cached is not None:
+            stream.append(cached)
+            return
+        try:
+            response = get_client().chat.completions.create(
+                model=MODEL, messages=[{"role": "user", "content": prompt}],
+                temperature=temperature, max_tokens=max_tokens, stream=True
+            )
+            chunks = []
+            for chunk in response:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    chunks.append(delta)
+                    stream.append(delta)
+            cache.put(key, "".join(chunks))
+        except Exception as e:
+            # エラー文はキャッシュしない
+            stream.append(f"アドバイスの生成中にエラーが発生しました: {e}")
+    return _single_flight.start(key, produce)
 
 # 総合アドバイス用の状況説明マッピング
 SUMMARY_PROMPTS = {
@@ -27,7 +92,11 @@ DETAILED_PROMPTS = {
     "SHARPNESS": "「写真がピンボケしている」と診断された就活生に、手ブレを防いでシャープな写真を撮るための具体的なアクション（例: 三脚やセルフタイマーの使用、撮影設定の見直し）を3つ提案してください。"
 }
 
-def generate_summary_advice(problem_keys, final_score):
+def start_summary_advice(problem_keys, final_score):
+    # 総合アドバイスの生成を開始し、AdviceStreamを返す（problem_keysが決まった時点で呼べる）。
+    # 並び順や重複が違うだけの同じ状況は同じプロンプト（＝同じキャッシュ）になるよう正規化する
+    problem_set = set(problem_keys)
+    problem_keys = [key for key in SUMMARY_PROMPTS if key in problem_set]
     if not problem_keys:
         prompt_core = f"総合スコアは{final_score:.0f}点でした。全ての項目で素晴らしい結果です。自信を持って就職活動に臨んでください、というポジティブな激励のメッセージを生成してください。"
     else:
@@ -41,29 +110,41 @@ def generate_summary_advice(problem_keys, final_score):
         "丁寧かつ前向きな口調で、150文字程度でお願いします。\n\n"
         f"{prompt_core}"
     )
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini", messages=[{"role": "user", "content": final_prompt}],
-            temperature=0.7, max_tokens=300
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"アドバイスの生成中にエラーが発生しました: {e}"
+    return _start(final_prompt, temperature=0.7, max_tokens=300)
 
-def generate_detailed_advice(problem_key):
+def start_detailed_advice(problem_key):
     if problem_key not in DETAILED_PROMPTS:
-        return "この項目に関する詳細なアドバイスはありません。"
+        return AdviceStream.completed("この項目に関する詳細なアドバイスはありません。")
     
     specific_instruction = DETAILED_PROMPTS[problem_key]
     final_prompt = (
         "あなたはプロの就活キャリアアドバイザーです。就活生の悩みに答える形で、以下の指示に厳密に従って、具体的で実践的なアドバイスを200文字程度で生成してください。\n\n"
         f"指示：{specific_instruction}"
     )
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini", messages=[{"role": "user", "content": final_prompt}],
-            temperature=0.6, max_tokens=400
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"アドバイスの生成中にエラーが発生しました: {e}"
\ No newline at end of file
+    return _start(final_prompt, temperature=0.6, max_tokens=400)
+
+def prefetch_detailed_advice(problem_keys):
+    # ボタンが押される前に、指摘のある項目の詳細アドバイスを先読みしておく
+    return {key: start_detailed_advice(key) for key in problem_keys}
+
+def generate_summary_advice(problem_keys, final_score):
+    return start_summary_advice(problem_keys, final_score).result()
+
+def generate_detailed_advice(problem_key):
+    return start_detailed_advice(problem_key).result()
+
+# --- キャッシュの事前投入 ---
+def prewarm_detailed_advice():
+    # 詳細アドバイスはキーごとにプロンプトが固定なので、全件を先に生成しておける
+    streams = prefetch_detailed_advice(DETAILED_PROMPTS)
+    return {key: stream.result() for key, stream in streams.items()}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="アドバイス生成のユーティリティ")
+    parser.add_argument("--prewarm", action="store_true", help="全項目の詳細アドバイスを生成してキャッシュに保存する")
+    args = parser.parse_args()
+    if args.prewarm:
+        for key, text in prewarm_detailed_advice().items():
+            print(f"[{key}] {text}")
+    else:
+        parser.print_help()
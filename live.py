@@ -0,0 +1,166 @@
+import argparse
+import queue
+import sys
+import threading
+import time
+
+import cv2
+
+from features import FaceAnalyzer, get_config
+
+# --- フレームの読み込み ---
+class FrameReader:
+    """動画ファイルまたはカメラからフレームを読み、上限付きのキューに入れるスレッド。
+
+    frame_step 枚に1枚だけデコードして渡す（残りは grab() で読み飛ばす）。
+    realtime=True のときはキューが満杯なら最も古いフレームを捨てて最新を入れるため、
+    分析が追いつかなくても遅れが溜まらない。False なら空くまで待つ（動画ファイルの全フレーム評価用）。
+    """
+
+    _END = object()
+
+    def __init__(self, source, queue_size=4, frame_step=1, realtime=True):
+        self.capture = cv2.VideoCapture(source)
+        if not self.capture.isOpened():
+            raise OSError(f"動画を開けません: {source}")
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.frame_step = max(1, frame_step)
+        self.realtime = realtime
+        self.read = self.dropped = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="frame-reader", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.capture.release()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _run(self):
+        index = -1
+        try:
+            while not self._stop.is_set():
+                if not self.capture.grab(): break
+                index += 1
+                if index % self.frame_step: continue
+                ok, frame_bgr = self.capture.retrieve()
+                if not ok: break
+                self.read += 1
+                item = (index, self.capture.get(cv2.CAP_PROP_POS_MSEC) / 1000, cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB))
+                if not self.realtime:
+                    self._put(item)
+                    continue
+                # 読み手は1つだけなので、古いものを1枚捨てれば必ず空きができる
+                try:
+                    self.frames.put_nowait(item)
+                except queue.Full:
+                    try:
+                        self.frames.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+                    self.frames.put_nowait(item)
+        finally:
+            self._put(self._END)
+
+    def __iter__(self):
+        # (フレーム番号, 動画内の時刻[秒], RGB画像) を順に返す
+        while True:
+            item = self.frames.get()
+            if item is self._END: return
+            yield item
+
+# --- ベストショットの選択 ---
+def find_best_shot(source, analyzer=None, frame_step=None, queue_size=None, realtime=None, max_seconds=None):
+    """動画（またはカメラ）のフレームを順に採点し、総合スコアが最も高いフレームを返す。
+
+    戻り値は FaceAnalyzer.analyze() と同じ形の辞書に、そのフレームの画像と
+    位置（frame_index, timestamp）、処理の統計（stats）を加えたもの。顔が一度も検出できなければNone。
+    """
+    live_cfg = get_config().get('live', {})
+    frame_step = frame_step or live_cfg.get('frame_step', 1)
+    queue_size = queue_size or live_cfg.get('queue_size', 4)
+    # カメラ（デバイス番号）はリアルタイムで時間を区切り、動画ファイルは最後まで全フレーム（frame_step間隔）を評価する
+    is_camera = isinstance(source, int)
+    if realtime is None: realtime = is_camera
+    if max_seconds is None: max_seconds = live_cfg.get('max_seconds', 0) if is_camera else 0
+    # トラッキングモードではフレームの順序に意味があるため、分析器は呼び出しごとに専有する
+    analyzer = analyzer or FaceAnalyzer(static_image_mode=False)
+
+    best = None
+    analyzed = no_face = 0
+    start = time.perf_counter()
+    with FrameReader(source, queue_size, frame_step, realtime) as reader:
+        try:
+            for index, timestamp, frame_rgb in reader:
+                features = analyzer.extract_features(frame_rgb)
+                analyzed += 1
+                if features is None:
+                    no_face += 1
+                else:
+                    evaluation = analyzer.evaluate(features["raw"])
+                    # 総合スコアが同点なら、より鮮明なフレームを選ぶ
+                    rank = (evaluation["final_score"], features["raw"]["sharpness"])
+                    if best is None or rank > best["rank"]:
+                        best = {**evaluation, **features, "rank": rank, "image": frame_rgb, "frame_index": index, "timestamp": timestamp}
+                if max_seconds and time.perf_counter() - start >= max_seconds: break
+        except KeyboardInterrupt:
+            # Ctrl+C（カメラを max_seconds なしで使うときの止め方）では、それまでのベストショットを返す
+            pass
+        elapsed = time.perf_counter() - start
+        stats = {
+            "read": reader.read, "analyzed": analyzed, "dropped": reader.dropped, "no_face": no_face,
+            "seconds": elapsed, "fps": analyzed / elapsed if elapsed > 0 else 0.0
+        }
+    if best is None: return None
+
+    # 注釈は最終的に選ばれた1枚についてだけ作る
+    height, width = best["image"].shape[:2]
+    return {
+        "results": best["results"],
+        "overlay": analyzer.annotation_overlay(best["landmarks"], width, height),
+        "final_score": best["final_score"],
+        "raw": best["raw"],
+        "landmarks": best["landmarks"],
+        "image": best["image"],
+        "frame_index": best["frame_index"],
+        "timestamp": best["timestamp"],
+        "stats": stats
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="動画やカメラの映像を採点し、最も良いフレームを静止画として保存します。")
+    parser.add_argument("source", help="動画ファイルのパス、またはカメラのデバイス番号（例: 0）")
+    parser.add_argument("-o", "--output", default="best_shot.jpg", help="ベストショットの保存先")
+    parser.add_argument("--frame-step", type=int, default=None, help="何フレームに1枚を評価するか")
+    parser.add_argument("--max-seconds", type=float, default=None, help="評価を打ち切るまでの秒数（0で最後まで）")
+    parser.add_argument("--realtime", action=argparse.BooleanOptionalAction, default=None,
+                        help="分析が追いつかないフレームを捨てる（既定: カメラのみ）")
+    args = parser.parse_args(argv)
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    best = find_best_shot(source, frame_step=args.frame_step, realtime=args.realtime, max_seconds=args.max_seconds)
+    if best is None:
+        print("顔を検出できたフレームがありませんでした。", file=sys.stderr)
+        sys.exit(1)
+    cv2.imwrite(args.output, cv2.cvtColor(best["image"], cv2.COLOR_RGB2BGR))
+    stats = best["stats"]
+    print(f"ベストショット: フレーム {best['frame_index']}（{best['timestamp']:.2f} 秒） 総合スコア {best['final_score']:.1f} -> {args.output}")
+    for result in best["results"].values():
+        print(f"  {result.label}: {result.normalized_score}（{result.status}）")
+    print(f"{stats['analyzed']} フレームを {stats['seconds']:.1f} 秒で評価しました"
+          f"（{stats['fps']:.1f} fps、読み飛ばし {stats['dropped']}、顔なし {stats['no_face']}）", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import os
+import time
+from contextlib import contextmanager
+
+# --- 処理段階ごとの時間計測 ---
+PROFILE_ENV = "FACE_ANALYZER_PROFILE"
+
+def profiling_enabled(config):
+    # 環境変数が設定されていればそちらを優先し、なければconfig.yamlのprofiling.enabledに従う
+    env = os.getenv(PROFILE_ENV)
+    if env is not None: return env.strip().lower() not in ("", "0", "false", "no", "off")
+    return bool(config.get('profiling', {}).get('enabled', False))
+
+class StageTimer:
+    """with timer.stage("name"): ... の区間の所要時間(秒)を段階名ごとに合計する。
+
+    無効時は時刻を取らずにそのまま実行するだけなので、本番でもほぼコストはかからない。
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.timings = {}
+
+    def reset(self):
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
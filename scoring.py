@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import yaml
+
+# --- データクラス定義 ---
+@dataclass
+class AnalysisResult:
+    label: str; value: float; status: str; message_key: str; normalized_score: int
+
+# --- 定数定義 ---
+# 画像から抽出する生データ。笑顔スコアは設定値(重み)に依存するため、口と目の2成分のまま保持する
+RAW_FEATURE_KEYS = ["brightness", "mouth_ratio", "eye_aspect_ratio", "tilt", "face_ratio", "center_offset", "sharpness"]
+SCORE_KEYS = ["brightness", "smile", "tilt", "face_ratio", "center_offset", "sharpness"]
+LABELS = {
+    "brightness": "顔の明るさ", "smile": "笑顔スコア", "tilt": "顔の傾き",
+    "face_ratio": "顔の比率", "center_offset": "中心位置", "sharpness": "写真の鮮明度"
+}
+MESSAGE_KEYS = {
+    "brightness": "BRIGHTNESS", "smile": "SMILE", "tilt": "TILT",
+    "face_ratio": "FACE_RATIO", "center_offset": "CENTER_OFFSET", "sharpness": "SHARPNESS"
+}
+# ステータスは配列上では整数コードで扱う（STATUS_CODES[code] で文字列に戻る）
+STATUS_CODES = ("OK", "WARN", "ERROR")
+OK, WARN, ERROR = range(3)
+
+def load_config(path='config.yaml'):
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+# --- 正規化（すべてNumPy配列で一括計算） ---
+def _normalize(value, ideal, worst, higher_is_better=True):
+    # 0〜100に丸める前にint()と同じく0方向へ切り捨てる
+    if ideal == worst:
+        passed = value >= ideal if higher_is_better else value <= ideal
+        return np.where(passed, 100, 0)
+    if higher_is_better:
+        score = ((value - worst) / (ideal - worst)) * 100
+    else:
+        score = ((worst - value) / (worst - ideal)) * 100
+    return np.clip(np.trunc(score), 0, 100).astype(np.int64)
+
+def _normalize_range(value, range_min, range_max):
+    center = (range_min + range_max) / 2
+    dist = np.abs(value - center)
+    max_dist = (range_max - range_min) / 2
+    if max_dist <= 0: return np.full(value.shape, 100, dtype=np.int64)
+    return np.clip(np.trunc((max_dist - dist) / max_dist * 100), 0, 100).astype(np.int64)
+
+def _status(passed, failed_code):
+    return np.where(passed, OK, failed_code).astype(np.int8)
+
+def smile_value(mouth_ratio, eye_aspect_ratio, cfg):
+    smile_cfg = cfg['smile']
+    eye_smile_score = np.maximum(0, 1 - (eye_aspect_ratio / smile_cfg['eye_aspect_ratio_base']))
+    return (mouth_ratio * smile_cfg['mouth_weight']) + (eye_smile_score * smile_cfg['eyes_weight'])
+
+# --- 採点 ---
+def score_table(raw_columns, cfg):
+    """生データの列（RAW_FEATURE_KEYSごとの配列）をまとめて採点する。
+
+    戻り値は values/scores/status（SCORE_KEYSごとの配列）と final_score（配列）。
+    画像処理を一切行わない純粋関数なので、設定を差し替えての再採点に使える。
+    """
+    raw = {key: np.asarray(raw_columns[key], dtype=np.float64) for key in RAW_FEATURE_KEYS}
+    brightness_cfg, smile_cfg, tilt_cfg = cfg['brightness'], cfg['smile'], cfg['tilt']
+    composition_cfg, sharpness_cfg = cfg['composition'], cfg['sharpness']
+
+    values = {
+        "brightness": raw["brightness"],
+        "smile": smile_value(raw["mouth_ratio"], raw["eye_aspect_ratio"], cfg),
+        "tilt": raw["tilt"],
+        "face_ratio": raw["face_ratio"],
+        "center_offset": raw["center_offset"],
+        "sharpness": raw["sharpness"]
+    }
+    status = {
+        "brightness": _status((brightness_cfg['ideal_min'] <= values["brightness"]) & (values["brightness"] <= brightness_cfg['ideal_max']), ERROR),
+        "smile": _status(values["smile"] >= smile_cfg['ideal_min'], WARN),
+        "tilt": _status(values["tilt"] <= tilt_cfg['ideal_max'], WARN),
+        "face_ratio": _status((composition_cfg['face_ratio_min'] <= values["face_ratio"]) & (values["face_ratio"] <= composition_cfg['face_ratio_max']), WARN),
+        "center_offset": _status(values["center_offset"] <= composition_cfg['center_offset_max'], WARN),
+        "sharpness": _status(values["sharpness"] >= sharpness_cfg['laplacian_variance_min'], ERROR)
+    }
+    scores = {
+        "brightness": _normalize_range(values["brightness"], brightness_cfg['ideal_min'], brightness_cfg['ideal_max']),
+        "smile": _normalize(values["smile"], smile_cfg['ideal_value'], smile_cfg['worst_value']),
+        "tilt": _normalize(values["tilt"], tilt_cfg['ideal_value'], tilt_cfg['worst_value'], higher_is_better=False),
+        "face_ratio": _normalize(
+            np.abs(values["face_ratio"] - composition_cfg['face_ratio_ideal']), 0,
+            abs(composition_cfg['face_ratio_worst'] - composition_cfg['face_ratio_ideal']), higher_is_better=False
+        ),
+        "center_offset": _normalize(values["center_offset"], composition_cfg['center_offset_ideal'], composition_cfg['center_offset_worst'], higher_is_better=False),
+        "sharpness": _normalize(values["sharpness"], sharpness_cfg['laplacian_variance_ideal'], sharpness_cfg['laplacian_variance_worst'])
+    }
+
+    # 総合スコアの計算
+    weights = cfg['scoring_weights']
+    total_score = np.zeros(len(raw["brightness"]), dtype=np.float64)
+    total_weight = 0
+    for key in SCORE_KEYS:
+        weight = weights.get(key, 0)
+        total_score += scores[key] * weight
+        total_weight += weight
+    final_score = total_score / total_weight if total_weight > 0 else np.zeros_like(total_score)
+
+    return {"values": values, "scores": scores, "status": status, "final_score": final_score}
+
+def evaluate(raw, cfg):
+    # 1枚分の生データを採点し、AnalysisResultの辞書と総合スコアを返す
+    table = score_table({key: [raw[key]] for key in RAW_FEATURE_KEYS}, cfg)
+    results = {
+        key: AnalysisResult(
+            LABELS[key], float(table["values"][key][0]), STATUS_CODES[table["status"][key][0]],
+            MESSAGE_KEYS[key], int(table["scores"][key][0])
+        )
+        for key in SCORE_KEYS
+    }
+    return {"results": results, "final_score": float(table["final_score"][0])}
+
+# --- 再採点CLI ---
+def load_raw_jsonl(path):
+    # batch.pyのJSONL出力から、顔が検出できた行の生データだけを列形式で読み込む
+    columns = {key: [] for key in RAW_FEATURE_KEYS}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if not record.get("raw"): continue
+            for key in RAW_FEATURE_KEYS:
+                columns[key].append(record["raw"][key])
+    return {key: np.asarray(values, dtype=np.float64) for key, values in columns.items()}
+
+def summarize(table):
+    final_score = table["final_score"]
+    summary = {
+        "count": int(final_score.size),
+        "mean": float(final_score.mean()) if final_score.size else 0.0,
+        "p50": float(np.median(final_score)) if final_score.size else 0.0,
+        "rank": {
+            "S": int((final_score >= 90).sum()),
+            "A": int(((final_score >= 80) & (final_score < 90)).sum()),
+            "B": int(((final_score >= 60) & (final_score < 80)).sum()),
+            "C": int((final_score < 60).sum())
+        },
+        "not_ok_rate": {MESSAGE_KEYS[key]: float((table["status"][key] != OK).mean()) if final_score.size else 0.0 for key in SCORE_KEYS}
+    }
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="保存済みの生データを、画像処理をやり直さずに別の設定で再採点します。")
+    parser.add_argument("raw_jsonl", help="batch.py が出力したJSONL、または --store で保存した結果ストアのディレクトリ")
+    parser.add_argument("configs", nargs="+", help="比較する設定ファイル（例: config.yaml config_b.yaml）")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.raw_jsonl):
+        from store import ResultStore
+        columns = ResultStore(args.raw_jsonl).raw_columns()
+    else:
+        columns = load_raw_jsonl(args.raw_jsonl)
+    for path in args.configs:
+        cfg = load_config(path)
+        start = time.perf_counter()
+        table = score_table(columns, cfg)
+        elapsed = time.perf_counter() - start
+        print(json.dumps({"config": path, "seconds": round(elapsed, 4), **summarize(table)}, ensure_ascii=False))
+    print(f"{len(columns['brightness'])} 件を {len(args.configs)} 通りの設定で再採点しました", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
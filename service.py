@@ -0,0 +1,164 @@
+import argparse
+import io
+import json
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image, UnidentifiedImageError
+
+from features import FaceAnalyzer, get_config
+
+# --- 分析ワーカープール ---
+class AnalyzerPool:
+    """起動済みのFaceAnalyzerを1スレッドに1つずつ持たせて、キュー経由で分析させるプール。
+
+    FaceMeshはスレッド間で共有できないため、インスタンスは各ワーカーが専有する。
+    キューは上限付きで、満杯のときは submit() が queue.Full を送出する（呼び出し側で503を返す）。
+    MediaPipeはバッチ推論ができないため、ワーカーは1件ずつ取り出して処理する。
+    まとめて取り出すと、空いているワーカーがあっても取り出した分が順番待ちになり、
+    キューの上限も受け付け済みの件数を制限しなくなるため。
+    """
+
+    def __init__(self, workers, queue_size):
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.workers = workers
+        for i in range(workers):
+            analyzer = FaceAnalyzer().warm_up()
+            threading.Thread(target=self._work, args=(analyzer,), name=f"analyzer-{i}", daemon=True).start()
+
+    def submit(self, image_bytes):
+        future = Future()
+        self.jobs.put_nowait((image_bytes, future))
+        return future
+
+    def _work(self, analyzer):
+        while True:
+            image_bytes, future = self.jobs.get()
+            # タイムアウトで取り消されたリクエストは分析しない
+            if not future.set_running_or_notify_cancel(): continue
+            try:
+                future.set_result(analyze_bytes(analyzer, image_bytes))
+            except Exception as e:
+                future.set_exception(e)
+
+def analyze_bytes(analyzer, image_bytes):
+    # JSONで返せる形に変換した分析結果。顔が検出できなければNone
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        data = analyzer.analyze(image)
+    if data is None: return None
+    return {
+        "final_score": data["final_score"],
+        "results": {key: asdict(result) for key, result in data["results"].items()},
+        "raw": data["raw"],
+        "overlay": {"hull": data["overlay"]["hull"].tolist(), "eye_lines": data["overlay"]["eye_lines"]}
+    }
+
+# --- HTTPハンドラ ---
+class AnalysisHandler(BaseHTTPRequestHandler):
+    # POST /analyze に画像のバイト列をそのまま送ると、採点結果をJSONで返す
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reject(self, status, payload, headers=None):
+        # 本文を読まずに返すときは接続を閉じる（読み残した本文が次のリクエストとして解釈されないように）
+        self.close_connection = True
+        self._send_json(status, payload, {**(headers or {}), "Connection": "close"})
+
+    def do_GET(self):
+        if self.path != "/healthz":
+            self._send_json(404, {"error": "NOT_FOUND"})
+            return
+        pool = self.server.pool
+        self._send_json(200, {"workers": pool.workers, "queue_depth": pool.jobs.qsize(), "queue_size": pool.jobs.maxsize})
+
+    def do_POST(self):
+        if self.path != "/analyze":
+            self._reject(404, {"error": "NOT_FOUND"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            self._reject(400, {"error": "INVALID_CONTENT_LENGTH"})
+            return
+        if length <= 0:
+            self._reject(400, {"error": "EMPTY_BODY"})
+            return
+        if length > self.server.max_upload_bytes:
+            self._reject(413, {"error": "TOO_LARGE"})
+            return
+        # キューが満杯なら本文を読み込む前に断り、待ちきれないアップロードでメモリを使わない
+        if self.server.pool.jobs.full():
+            self._reject(503, {"error": "BUSY"}, {"Retry-After": "1"})
+            return
+        image_bytes = self.rfile.read(length)
+
+        try:
+            future = self.server.pool.submit(image_bytes)
+        except queue.Full:
+            # 処理しきれない分は受け付けずに返し、クライアント側で再送してもらう
+            self._send_json(503, {"error": "BUSY"}, {"Retry-After": "1"})
+            return
+        try:
+            result = future.result(timeout=self.server.request_timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self._send_json(504, {"error": "TIMEOUT"})
+            return
+        except (UnidentifiedImageError, OSError) as e:
+            self._send_json(400, {"error": "INVALID_IMAGE", "detail": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": "ANALYSIS_FAILED", "detail": str(e)})
+            return
+
+        if result is None:
+            self._send_json(422, {"error": "NO_FACE"})
+        else:
+            self._send_json(200, result)
+
+    def log_message(self, format, *args):
+        pass
+
+def create_server(host, port, pool, request_timeout=30.0, max_upload_bytes=20 * 1024 * 1024):
+    server = ThreadingHTTPServer((host, port), AnalysisHandler)
+    server.daemon_threads = True
+    server.pool = pool
+    server.request_timeout = request_timeout
+    server.max_upload_bytes = max_upload_bytes
+    return server
+
+def main(argv=None):
+    service_cfg = get_config().get('service', {})
+    parser = argparse.ArgumentParser(description="写真の採点結果をJSONで返すHTTPサービス")
+    parser.add_argument("--host", default=service_cfg.get('host', '127.0.0.1'))
+    parser.add_argument("--port", type=int, default=service_cfg.get('port', 8080))
+    parser.add_argument("--workers", type=int, default=service_cfg.get('workers', 2))
+    parser.add_argument("--queue-size", type=int, default=service_cfg.get('queue_size', 16))
+    args = parser.parse_args(argv)
+
+    pool = AnalyzerPool(args.workers, args.queue_size)
+    server = create_server(
+        args.host, args.port, pool,
+        request_timeout=service_cfg.get('request_timeout_s', 30),
+        max_upload_bytes=int(service_cfg.get('max_upload_mb', 20) * 1024 * 1024)
+    )
+    print(f"http://{args.host}:{args.port}/analyze で待ち受けています（ワーカー {args.workers}、キュー上限 {args.queue_size}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
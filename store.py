@@ -0,0 +1,167 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from scoring import MESSAGE_KEYS, RAW_FEATURE_KEYS, SCORE_KEYS, STATUS_CODES, OK
+
+# --- 定数定義 ---
+LANDMARK_COUNT = 478
+# 1件80バイトの固定長レコード。status は scoring.STATUS_CODES のインデックス
+# 生データは再採点に使うため、閾値ちょうど付近の判定が変わらないようJSONLと同じfloat64で持つ
+RESULT_DTYPE = np.dtype([
+    ("analyzed_at", np.float64),
+    ("final_score", np.float32),
+    ("raw", [(key, np.float64) for key in RAW_FEATURE_KEYS]),
+    ("score", [(key, np.uint8) for key in SCORE_KEYS]),
+    ("status", [(key, np.int8) for key in SCORE_KEYS])
+])
+
+def _chunk_files(path, prefix):
+    return sorted(glob.glob(os.path.join(path, f"{prefix}-*.npy")))
+
+def _save_atomic(path, array):
+    # 書き込み途中のファイルを読み手に見せないよう、一時ファイルに書いてから置き換える
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+# --- 追記 ---
+class ResultWriter:
+    """採点結果を chunk_rows 件ごとのチャンク（NumPyの構造化配列の.npy）として追記するライタ。
+
+    書き出したチャンクは以後書き換えない。landmarks=True のときは478点のランドマークを
+    float16で別ファイル（landmarks-N.npy）に、画像パスは paths-N.txt に保存する。
+    1つのディレクトリに同時に書き込むライタは1つだけとすること。
+    """
+
+    def __init__(self, path, chunk_rows=4096, landmarks=False):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.chunk_rows = chunk_rows
+        existing = _chunk_files(path, "chunk")
+        self.next_chunk = int(os.path.basename(existing[-1])[6:-4]) + 1 if existing else 0
+        self.rows = np.zeros(chunk_rows, dtype=RESULT_DTYPE)
+        self.landmarks = np.empty((chunk_rows, LANDMARK_COUNT, 3), dtype=np.float16) if landmarks else None
+        self.paths = []
+        self.skipped = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, raw, results, final_score, path=None, landmarks=None, analyzed_at=None):
+        # results は SCORE_KEYSごとの AnalysisResult、またはそれをasdictした辞書
+        rows, i = self.rows, len(self.paths)
+        rows["analyzed_at"][i] = analyzed_at or time.time()
+        rows["final_score"][i] = final_score
+        for key in RAW_FEATURE_KEYS:
+            rows["raw"][key][i] = raw[key]
+        for key in SCORE_KEYS:
+            result = results[key]
+            if not isinstance(result, dict): result = vars(result)
+            rows["score"][key][i] = result["normalized_score"]
+            rows["status"][key][i] = STATUS_CODES.index(result["status"])
+        if self.landmarks is not None:
+            self.landmarks[i] = np.nan if landmarks is None else landmarks
+        self.paths.append(path or "")
+        if len(self.paths) == self.chunk_rows: self.flush()
+
+    def write(self, record):
+        # batch.py の1件分の記録を追記する（顔が検出できなかった・失敗した画像は数えるだけで保存しない）
+        if not record.get("raw"):
+            self.skipped += 1
+            return
+        self.append(record["raw"], record["results"], record["final_score"], record["path"], record.get("landmarks"))
+
+    def flush(self):
+        count = len(self.paths)
+        if not count: return
+        name = f"{self.next_chunk:06d}"
+        # チャンク本体を最後に置くことで、本体が見えた時点で付随ファイルも揃っているようにする
+        with open(os.path.join(self.path, f"paths-{name}.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(self.paths) + "\n")
+        if self.landmarks is not None:
+            _save_atomic(os.path.join(self.path, f"landmarks-{name}.npy"), self.landmarks[:count])
+        _save_atomic(os.path.join(self.path, f"chunk-{name}.npy"), self.rows[:count])
+        self.next_chunk += 1
+        self.rows[:] = 0
+        self.paths = []
+
+    def close(self):
+        self.flush()
+
+# --- 読み出し・集計 ---
+class ResultStore:
+    """ResultWriter が書いたチャンクをメモリマップで読み、チャンク単位で集計する。"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def chunks(self):
+        return [np.load(file, mmap_mode="r") for file in _chunk_files(self.path, "chunk")]
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self.chunks())
+
+    def landmarks(self, chunk_index):
+        # 該当チャンクのランドマーク（件数, 478, 3）。保存していなければNone
+        file = os.path.join(self.path, f"landmarks-{chunk_index:06d}.npy")
+        return np.load(file, mmap_mode="r") if os.path.exists(file) else None
+
+    def paths(self, chunk_index):
+        with open(os.path.join(self.path, f"paths-{chunk_index:06d}.txt"), "r", encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def column(self, field, key=None):
+        # 全チャンクの1列を連結して返す（例: column("final_score"), column("status", "smile")）
+        parts = [chunk[field] if key is None else chunk[field][key] for chunk in self.chunks()]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=RESULT_DTYPE[field] if key is None else RESULT_DTYPE[field][key])
+
+    def raw_columns(self):
+        # scoring.score_table にそのまま渡せる生データの列（別の設定での再採点用）
+        return {key: self.column("raw", key) for key in RAW_FEATURE_KEYS}
+
+    def score_distribution(self, key=None, bins=10):
+        # 0〜100をbins等分したヒストグラム。keyを省略すると総合スコア
+        edges = np.linspace(0, 100, bins + 1)
+        counts = np.zeros(bins, dtype=np.int64)
+        for chunk in self.chunks():
+            counts += np.histogram(chunk["final_score"] if key is None else chunk["score"][key], bins=edges)[0]
+        return counts, edges
+
+    def failure_rates(self):
+        # MESSAGE_KEYごとの WARN / ERROR の割合
+        counts = {key: np.zeros(len(STATUS_CODES), dtype=np.int64) for key in SCORE_KEYS}
+        total = 0
+        for chunk in self.chunks():
+            total += len(chunk)
+            for key in SCORE_KEYS:
+                counts[key] += np.bincount(chunk["status"][key], minlength=len(STATUS_CODES))
+        return {
+            MESSAGE_KEYS[key]: {code: float(counts[key][i] / total) if total else 0.0 for i, code in enumerate(STATUS_CODES) if i != OK}
+            for key in SCORE_KEYS
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="保存済みの採点結果ストアを集計します。")
+    parser.add_argument("path", help="batch.py --store で指定したディレクトリ")
+    parser.add_argument("--bins", type=int, default=10, help="スコア分布の階級数")
+    args = parser.parse_args(argv)
+
+    store = ResultStore(args.path)
+    counts, edges = store.score_distribution(bins=args.bins)
+    print(json.dumps({
+        "count": int(counts.sum()),
+        "final_score_distribution": {f"{edges[i]:.0f}-{edges[i + 1]:.0f}": int(count) for i, count in enumerate(counts)},
+        "failure_rates": store.failure_rates()
+    }, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
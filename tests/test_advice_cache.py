@@ -0,0 +1,109 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import advice_cache
+import gpt_advice
+from advice_cache import AdviceCache
+
+
+class StubClient:
+    """chat.completions.create(stream=True) の代わりに、決まったテキスト片を返す数え上げ用のスタブ"""
+
+    def __init__(self, chunks=("良い", "写真", "です"), fail_times=0, gate=None):
+        self.chunks = chunks
+        self.fail_times = fail_times
+        self.gate = gate
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        with self.lock:
+            self.calls += 1
+            fail = self.calls <= self.fail_times
+        if self.gate is not None: self.gate.wait(timeout=5)
+        if fail: raise RuntimeError("rate limited")
+        return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))]) for text in self.chunks])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"t": 1000.0}
+    monkeypatch.setattr(advice_cache.time, "time", lambda: now["t"])
+    return now
+
+
+@pytest.fixture
+def advice_env(tmp_path, monkeypatch):
+    cache = AdviceCache(str(tmp_path / "advice.sqlite3"), ttl_seconds=3600, max_entries=100)
+    monkeypatch.setattr(gpt_advice, "_advice_cache", cache)
+
+    def install(client):
+        monkeypatch.setattr(gpt_advice, "client", client)
+        return client
+    return cache, install
+
+
+# --- AdviceCache ---
+def test_ttl_expiry(tmp_path, clock):
+    cache = AdviceCache(str(tmp_path / "advice.sqlite3"), ttl_seconds=60, max_entries=10)
+    cache.put("k", "text")
+    clock["t"] += 59
+    assert cache.get("k") == "text"
+    clock["t"] += 2
+    assert cache.get("k") is None
+
+
+def test_lru_cap_evicts_least_recently_accessed(tmp_path, clock):
+    cache = AdviceCache(str(tmp_path / "advice.sqlite3"), ttl_seconds=3600, max_entries=2)
+    cache.put("a", "A")
+    clock["t"] += 1
+    cache.put("b", "B")
+    clock["t"] += 1
+    assert cache.get("a") == "A"  # a の方が最近使われた
+    clock["t"] += 1
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+
+# --- 生成とキャッシュ ---
+def test_stream_yields_chunks_and_caches(advice_env):
+    cache, install = advice_env
+    client = install(StubClient())
+    stream = gpt_advice.start_detailed_advice("SMILE")
+    assert list(stream) == ["良い", "写真", "です"]
+    assert stream.result(timeout=5) == "良い写真です"
+    # 2回目はキャッシュから完成済みで返り、APIは呼ばれない
+    assert gpt_advice.generate_detailed_advice("SMILE") == "良い写真です"
+    assert client.calls == 1
+
+
+def test_concurrent_identical_requests_share_one_call(advice_env):
+    cache, install = advice_env
+    gate = threading.Event()
+    client = install(StubClient(gate=gate))
+    streams = []
+    threads = [threading.Thread(target=lambda: streams.append(gpt_advice.start_detailed_advice("TILT"))) for _ in range(8)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    gate.set()
+    assert len({id(stream) for stream in streams}) == 1
+    assert [stream.result(timeout=5) for stream in streams] == ["良い写真です"] * 8
+    assert client.calls == 1
+
+
+def test_errors_are_not_cached(advice_env):
+    cache, install = advice_env
+    client = install(StubClient(fail_times=1))
+    text = gpt_advice.generate_detailed_advice("BRIGHTNESS")
+    assert "エラー" in text
+    # 失敗した応答はキャッシュされず、次の呼び出しでAPIをもう一度呼ぶ
+    assert gpt_advice.generate_detailed_advice("BRIGHTNESS") == "良い写真です"
+    assert client.calls == 2
+    assert gpt_advice.generate_detailed_advice("BRIGHTNESS") == "良い写真です"
+    assert client.calls == 2
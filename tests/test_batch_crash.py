@@ -0,0 +1,65 @@
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+import batch  # noqa: E402
+
+
+# --- ワーカー側のスタブ（プロセス間で受け渡すため、モジュール直下に定義する） ---
+def stub_init(keep_landmarks=False):
+    pass
+
+
+def failing_init(keep_landmarks=False):
+    raise RuntimeError("mediapipe を読み込めませんでした")
+
+
+def stub_analyze(path):
+    # "bad" を含むパスはネイティブコードのクラッシュを模してプロセスごと終了する。
+    # 他の画像が処理中のうちに落ちるよう、正常な画像の方を長めに待たせる
+    if "bad" in path:
+        time.sleep(0.02)
+        os._exit(1)
+    time.sleep(0.05)
+    return {"path": path, "final_score": 80.0, "error": None, "results": {}, "raw": {}}
+
+
+@pytest.fixture
+def stub_worker(monkeypatch):
+    monkeypatch.setattr(batch, "_init_worker", stub_init)
+    monkeypatch.setattr(batch, "_analyze_path", stub_analyze)
+
+
+def run(paths, **kwargs):
+    records = list(batch.iter_batch(paths, **kwargs))
+    assert sorted(record["path"] for record in records) == sorted(paths)  # 1枚につき1件だけ
+    return {record["path"]: record for record in records}
+
+
+def test_only_the_crashing_image_is_marked(stub_worker):
+    paths = [f"good-{i}.jpg" for i in range(20)]
+    paths.insert(3, "bad.jpg")
+    records = run(paths, workers=4, max_pending=8)
+    assert records["bad.jpg"]["error"] == batch.WORKER_CRASHED
+    assert all(record["error"] is None for path, record in records.items() if path != "bad.jpg")
+
+
+def test_several_crashing_images(stub_worker):
+    paths = [f"good-{i}.jpg" for i in range(16)]
+    for i, name in ((2, "bad-a.jpg"), (5, "bad-b.jpg"), (11, "bad-c.jpg")):
+        paths.insert(i, name)
+    records = run(paths, workers=3, max_pending=6)
+    crashed = {path for path, record in records.items() if record["error"] == batch.WORKER_CRASHED}
+    assert crashed == {"bad-a.jpg", "bad-b.jpg", "bad-c.jpg"}
+    assert all(records[path]["error"] is None for path in paths if path not in crashed)
+
+
+def test_aborts_when_the_initializer_keeps_failing(monkeypatch):
+    monkeypatch.setattr(batch, "_init_worker", failing_init)
+    monkeypatch.setattr(batch, "_analyze_path", stub_analyze)
+    with pytest.raises(BrokenProcessPool):
+        list(batch.iter_batch([f"good-{i}.jpg" for i in range(50)], workers=2, max_pending=4))
@@ -0,0 +1,86 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+import scoring  # noqa: E402
+from store import LANDMARK_COUNT, ResultStore, ResultWriter  # noqa: E402
+
+
+# --- batch.py と同じ形の記録を作る ---
+def make_record(i, landmarks=True):
+    # float32 では表せない値にして、生データがfloat64のまま往復することを確かめる
+    raw = {key: 0.1 * (i + 1) + j / 3 + i * 1e-9 for j, key in enumerate(scoring.RAW_FEATURE_KEYS)}
+    results = {}
+    for key in scoring.SCORE_KEYS:
+        status = "OK"
+        if key == "smile" and i % 3 == 0: status = "WARN"
+        if key == "sharpness" and i % 4 == 0: status = "ERROR"
+        results[key] = {"label": scoring.LABELS[key], "value": 0.0, "status": status,
+                        "message_key": scoring.MESSAGE_KEYS[key], "normalized_score": (i * 7) % 101}
+    record = {"path": f"img-{i:03d}.jpg", "final_score": i * 9.5, "error": None, "results": results, "raw": raw}
+    if landmarks: record["landmarks"] = np.full((LANDMARK_COUNT, 3), i / 8, dtype=np.float16)
+    return record
+
+
+def no_face_record(i):
+    return {"path": f"img-{i:03d}.jpg", "final_score": None, "error": "NO_FACE", "results": {}, "raw": None}
+
+
+def test_round_trip_across_writers(tmp_path):
+    path = str(tmp_path / "store")
+    records = [make_record(i, landmarks=(i != 2)) for i in range(11)]
+
+    # 1つ目のライタ: チャンク3件ずつで7件（2チャンク + close時の端数1件）と顔なし1件
+    with ResultWriter(path, chunk_rows=3, landmarks=True) as writer:
+        for record in records[:4]:
+            writer.write(record)
+        writer.write(no_face_record(99))
+        for record in records[4:7]:
+            writer.write(record)
+    assert writer.skipped == 1
+    assert writer.next_chunk == 3
+
+    # 2つ目のライタは既存のチャンクの続きの番号から書く
+    with ResultWriter(path, chunk_rows=3, landmarks=True) as writer:
+        assert writer.next_chunk == 3
+        for record in records[7:]:
+            writer.write(record)
+    assert writer.next_chunk == 5
+
+    store = ResultStore(path)
+    assert len(store) == len(records)
+    assert [len(chunk) for chunk in store.chunks()] == [3, 3, 1, 3, 1]
+    assert sum((store.paths(i) for i in range(5)), []) == [record["path"] for record in records]
+
+    # 生データはfloat64の入力と完全に一致する
+    raw = store.raw_columns()
+    for key in scoring.RAW_FEATURE_KEYS:
+        assert raw[key].dtype == np.float64
+        assert raw[key].tolist() == [record["raw"][key] for record in records]
+
+    # ランドマークを渡さなかった行はNaN、それ以外はfloat16のまま
+    first = store.landmarks(0)
+    assert first.shape == (3, LANDMARK_COUNT, 3) and first.dtype == np.float16
+    assert np.all(first[0] == 0) and np.all(first[1] == np.float16(1 / 8))
+    assert np.all(np.isnan(first[2]))
+
+    final_scores = np.array([record["final_score"] for record in records], dtype=np.float32)
+    assert store.column("final_score").tolist() == final_scores.tolist()
+    counts, edges = store.score_distribution(bins=10)
+    assert counts.tolist() == np.histogram(final_scores, bins=edges)[0].tolist()
+    assert counts.sum() == len(records)
+    smile_scores = [record["results"]["smile"]["normalized_score"] for record in records]
+    assert store.score_distribution("smile", bins=5)[0].tolist() == np.histogram(smile_scores, bins=np.linspace(0, 100, 6))[0].tolist()
+
+    # 顔なしの記録は件数に含めない（11件中、笑顔のWARNは i=0,3,6,9、鮮明度のERRORは i=0,4,8）
+    rates = store.failure_rates()
+    assert rates["SMILE"] == {"WARN": 4 / 11, "ERROR": 0.0}
+    assert rates["SHARPNESS"] == {"WARN": 0.0, "ERROR": 3 / 11}
+    assert rates["BRIGHTNESS"] == {"WARN": 0.0, "ERROR": 0.0}
+
+
+def test_empty_store(tmp_path):
+    store = ResultStore(str(tmp_path))
+    assert len(store) == 0
+    assert store.column("final_score").size == 0
+    assert store.score_distribution()[0].sum() == 0
+    assert store.failure_rates()["SMILE"] == {"WARN": 0.0, "ERROR": 0.0}
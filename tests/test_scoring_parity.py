@@ -0,0 +1,142 @@
+import copy
+import itertools
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+import scoring  # noqa: E402
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yaml")
+
+
+# --- 置き換え前（1枚ずつ採点していた features.FaceAnalyzer）の計算式 ---
+def baseline_normalize(value, ideal, worst, is_range=False, range_min=0, range_max=0, higher_is_better=True):
+    if is_range:
+        center = (range_min + range_max) / 2
+        dist = abs(value - center)
+        max_dist = (range_max - range_min) / 2
+        score = (max_dist - dist) / max_dist * 100 if max_dist > 0 else 100
+    else:
+        if higher_is_better:
+            if ideal == worst: return 100 if value >= ideal else 0
+            score = ((value - worst) / (ideal - worst)) * 100
+        else:
+            if ideal == worst: return 100 if value <= ideal else 0
+            score = ((worst - value) / (worst - ideal)) * 100
+    return max(0, min(100, int(score)))
+
+
+def baseline_evaluate(raw, config):
+    smile_cfg = config['smile']
+    eye_smile_score = max(0, 1 - (raw["eye_aspect_ratio"] / smile_cfg['eye_aspect_ratio_base']))
+    smile = (raw["mouth_ratio"] * smile_cfg['mouth_weight']) + (eye_smile_score * smile_cfg['eyes_weight'])
+
+    cfg = config['brightness']
+    value = raw["brightness"]
+    results = {"brightness": (value, "OK" if cfg['ideal_min'] <= value <= cfg['ideal_max'] else "ERROR",
+                              baseline_normalize(value, 0, 0, is_range=True, range_min=cfg['ideal_min'], range_max=cfg['ideal_max']))}
+    cfg = config['smile']
+    results["smile"] = (smile, "OK" if smile >= cfg['ideal_min'] else "WARN",
+                        baseline_normalize(smile, cfg['ideal_value'], cfg['worst_value']))
+    cfg = config['tilt']
+    value = raw["tilt"]
+    results["tilt"] = (value, "OK" if value <= cfg['ideal_max'] else "WARN",
+                       baseline_normalize(value, cfg['ideal_value'], cfg['worst_value'], higher_is_better=False))
+    cfg = config['composition']
+    value = raw["face_ratio"]
+    results["face_ratio"] = (value, "OK" if cfg['face_ratio_min'] <= value <= cfg['face_ratio_max'] else "WARN",
+                             baseline_normalize(abs(value - cfg['face_ratio_ideal']), 0, abs(cfg['face_ratio_worst'] - cfg['face_ratio_ideal']), higher_is_better=False))
+    value = raw["center_offset"]
+    results["center_offset"] = (value, "OK" if value <= cfg['center_offset_max'] else "WARN",
+                                baseline_normalize(value, cfg['center_offset_ideal'], cfg['center_offset_worst'], higher_is_better=False))
+    cfg = config['sharpness']
+    value = raw["sharpness"]
+    results["sharpness"] = (value, "OK" if value >= cfg['laplacian_variance_min'] else "ERROR",
+                            baseline_normalize(value, cfg['laplacian_variance_ideal'], cfg['laplacian_variance_worst']))
+
+    total_score = total_weight = 0
+    for key, (_, _, score) in results.items():
+        weight = config['scoring_weights'].get(key, 0)
+        total_score += score * weight
+        total_weight += weight
+    return results, (total_score / total_weight if total_weight > 0 else 0)
+
+
+# --- 比較に使う生データと設定 ---
+def threshold_values(*points, spread=()):
+    # 閾値ちょうど・その前後（浮動小数点で隣の値）と、指定した幅のずれ
+    values = set()
+    for point in points:
+        values.update([point, np.nextafter(point, -np.inf), np.nextafter(point, np.inf)])
+        values.update(point + delta for delta in spread)
+    return sorted(float(v) for v in values)
+
+
+def raw_grid(config):
+    b, s, t, c, sh = config['brightness'], config['smile'], config['tilt'], config['composition'], config['sharpness']
+    # 笑顔は口幅比と目のEARの2成分から計算されるため、笑顔スコアが閾値ちょうどになる口幅比も含める
+    eye_ratio = s['eye_aspect_ratio_base']
+    mouth_on_threshold = [v / s['mouth_weight'] for v in (s['ideal_min'], s['ideal_value'], s['worst_value'])] if s['mouth_weight'] else []
+    axes = {
+        "brightness": threshold_values(b['ideal_min'], b['ideal_max'], (b['ideal_min'] + b['ideal_max']) / 2, 0.0, 255.0, spread=(-7.3, 11.9)),
+        "mouth_ratio": threshold_values(0.0, 0.5, 1.0, *mouth_on_threshold, spread=(-0.11, 0.07)),
+        "eye_aspect_ratio": threshold_values(0.0, eye_ratio, eye_ratio / 2, spread=(-0.03, 0.05)),
+        "tilt": threshold_values(t['ideal_max'], t['ideal_value'], t['worst_value'], spread=(0.004, 0.021)),
+        "face_ratio": threshold_values(c['face_ratio_min'], c['face_ratio_max'], c['face_ratio_ideal'], c['face_ratio_worst'], spread=(-0.06, 0.09)),
+        "center_offset": threshold_values(c['center_offset_max'], c['center_offset_ideal'], c['center_offset_worst'], spread=(0.013, 0.2)),
+        "sharpness": threshold_values(sh['laplacian_variance_min'], sh['laplacian_variance_ideal'], sh['laplacian_variance_worst'], 0.0, spread=(-13.7, 400.0)),
+    }
+    # 1項目ずつ格子上で動かし、残りの項目は代表値に固定する。加えて全項目を乱数で組み合わせた行を足す
+    base = {key: values[len(values) // 2] for key, values in axes.items()}
+    rows = [dict(base, **{key: value}) for key, values in axes.items() for value in values]
+    rng = np.random.default_rng(0)
+    rows += [{key: float(rng.choice(values)) for key, values in axes.items()} for _ in range(2000)]
+    return rows
+
+
+def config_variants():
+    config = scoring.load_config(CONFIG_PATH)
+    yield pytest.param(config, id="default")
+    # ideal == worst の分岐（0点か100点）
+    variant = copy.deepcopy(config)
+    variant['smile']['worst_value'] = variant['smile']['ideal_value']
+    variant['tilt']['worst_value'] = variant['tilt']['ideal_value']
+    variant['sharpness']['laplacian_variance_worst'] = variant['sharpness']['laplacian_variance_ideal']
+    variant['composition']['face_ratio_worst'] = variant['composition']['face_ratio_ideal']
+    yield pytest.param(variant, id="ideal_equals_worst")
+    # 範囲の幅が0（max_dist <= 0）
+    variant = copy.deepcopy(config)
+    variant['brightness']['ideal_max'] = variant['brightness']['ideal_min']
+    yield pytest.param(variant, id="empty_range")
+    # 重みの合計が0
+    variant = copy.deepcopy(config)
+    variant['scoring_weights'] = {key: 0 for key in variant['scoring_weights']}
+    yield pytest.param(variant, id="zero_weights")
+
+
+@pytest.mark.parametrize("config", list(config_variants()))
+def test_score_table_matches_baseline(config):
+    rows = raw_grid(config)
+    table = scoring.score_table({key: [row[key] for row in rows] for key in scoring.RAW_FEATURE_KEYS}, config)
+    for i, row in enumerate(rows):
+        expected, expected_final = baseline_evaluate(row, config)
+        for key in scoring.SCORE_KEYS:
+            value, status, score = expected[key]
+            assert table["values"][key][i] == value, (key, row)
+            assert scoring.STATUS_CODES[table["status"][key][i]] == status, (key, row)
+            assert table["scores"][key][i] == score, (key, row)
+        assert table["final_score"][i] == expected_final, row
+
+
+@pytest.mark.parametrize("config", list(config_variants()))
+def test_evaluate_matches_baseline(config):
+    for row in itertools.islice(raw_grid(config), 300):
+        expected, expected_final = baseline_evaluate(row, config)
+        evaluation = scoring.evaluate(row, config)
+        for key in scoring.SCORE_KEYS:
+            result = evaluation["results"][key]
+            assert (result.value, result.status, result.normalized_score) == expected[key], (key, row)
+            assert result.label == scoring.LABELS[key] and result.message_key == scoring.MESSAGE_KEYS[key]
+            assert isinstance(result.normalized_score, int) and isinstance(result.value, float)
+        assert evaluation["final_score"] == expected_final